@@ -1,9 +1,21 @@
 # Model Training Script for MindScope-2025
 # Trains ML models to predict depression and anxiety levels
+#
+# Tree candidates are fitted on Risk_Level, Depression_Level and Anxiety_Level
+# at once (a 2-D target): one set of trees, one evaluation at serve time for
+# all three. Every candidate is still compared and selected on Risk_Level.
+#
+# Each stage (load, clean, encode, split, fit, evaluate, dump) is a function so
+# benchmark_training.py can time them; running the script runs them in order.
+# The dump stage also distils the forest into a small student (distill.py):
+#   python 02_model_training.py --max-loss 0.005
+
+import argparse
+import os
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
 from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
@@ -11,76 +23,18 @@ from sklearn.tree import DecisionTreeClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix, classification_report
 import joblib
 import warnings
+from clinical import get_depression_level, get_anxiety_level, get_risk_level
+from bundle import publish
+from cascade import write_cascade
+from compiled_model import export_model
+from distill import DEFAULT_MAX_LOSS, compare, print_comparison, write_distilled
+from inference import ENCODED_COLUMNS, TARGETS, save_fill_values
+from ingest import DATASET_PATH, read_dataset, fillna_category
 warnings.filterwarnings('ignore')
 
-# ==================== DATA LOADING & CLEANING ====================
-print("Loading and cleaning data...")
-df = pd.read_csv(r'Data/Global_Mental_Health_Dataset_2025.csv')
-
-# Derive depression and anxiety levels based on clinical thresholds
-def get_depression_level(score):
-    if score <= 4:
-        return 'Minimal'
-    elif score <= 9:
-        return 'Mild'
-    elif score <= 14:
-        return 'Moderate'
-    elif score <= 19:
-        return 'Moderately Severe'
-    else:
-        return 'Severe'
-
-def get_anxiety_level(score):
-    if score <= 4:
-        return 'Minimal'
-    elif score <= 9:
-        return 'Mild'
-    elif score <= 14:
-        return 'Moderate'
-    else:
-        return 'Severe'
-
-# Create target columns
-df['Depression_Level'] = df['Depression_Score'].apply(get_depression_level)
-df['Anxiety_Level'] = df['Anxiety_Score'].apply(get_anxiety_level)
-
-# Create combined risk level
-def get_risk_level(dep_score, anx_score):
-    risk = (dep_score + anx_score) / 2
-    if risk < 5:
-        return 'Low'
-    elif risk < 12:
-        return 'Moderate'
-    else:
-        return 'High'
-
-df['Risk_Level'] = df.apply(lambda row: get_risk_level(row['Depression_Score'], row['Anxiety_Score']), axis=1)
-
-# Handle missing values
-df['Sleep_Hours'].fillna(df['Sleep_Hours'].median(), inplace=True)
-df['Physical_Activity'].fillna(df['Physical_Activity'].mode()[0], inplace=True)
-df['Treatment'].fillna('None', inplace=True)
-
-# Encode categorical variables
-le_gender = LabelEncoder()
-le_stress = LabelEncoder()
-le_activity = LabelEncoder()
-le_illness = LabelEncoder()
-le_history = LabelEncoder()
-le_treatment = LabelEncoder()
-le_work = LabelEncoder()
-
-df['Gender_Encoded'] = le_gender.fit_transform(df['Gender'])
-df['Stress_Level_Encoded'] = le_stress.fit_transform(df['Stress_Level'])
-df['Physical_Activity_Encoded'] = le_activity.fit_transform(df['Physical_Activity'])
-df['Chronic_Illness_Encoded'] = le_illness.fit_transform(df['Chronic_Illness'])
-df['Mental_Health_History_Encoded'] = le_history.fit_transform(df['Mental_Health_History'])
-df['Treatment_Encoded'] = le_treatment.fit_transform(df['Treatment'])
-df['Work_Status_Encoded'] = le_work.fit_transform(df['Work_Status'])
-
 # ==================== FEATURE SELECTION ====================
 feature_cols = [
-    'Age', 
+    'Age',
     'Gender_Encoded',
     'Depression_Score',
     'Anxiety_Score',
@@ -94,90 +48,266 @@ feature_cols = [
     'Work_Status_Encoded'
 ]
 
-X = df[feature_cols]
-y_depression = df['Depression_Level']
-y_anxiety = df['Anxiety_Level']
-y_risk = df['Risk_Level']
+CV_FOLDS = 5
+# Candidates whose estimator fits every target in TARGETS in one pass
+MULTI_TARGET = {'Decision Tree', 'Random Forest'}
+
+
+# ==================== DATA LOADING & CLEANING ====================
+def load_data(path=DATASET_PATH, chunksize=None, cache=True):
+    """Typed load (categories, small ints, float32) with a Parquet cache after the
+    first run; pass chunksize=... for extracts too large to parse in one go."""
+    return read_dataset(path, chunksize=chunksize, cache=cache)
+
+
+def fill_values(df):
+    """What clean_data puts into blank cells; saved with the artifacts so serving fills the same way."""
+    return {
+        'Sleep_Hours': float(df['Sleep_Hours'].median()),
+        'Physical_Activity': str(df['Physical_Activity'].mode()[0]),
+        'Treatment': 'None',
+    }
+
+
+def clean_data(df, fills=None):
+    """Derive the clinical targets and fill missing values (by default with fill_values(df))."""
+    # Depression, anxiety and combined risk levels from the clinical thresholds
+    # (vectorized over the whole column, shared with the app)
+    df['Depression_Level'] = get_depression_level(df['Depression_Score'])
+    df['Anxiety_Level'] = get_anxiety_level(df['Anxiety_Score'])
+    df['Risk_Level'] = get_risk_level(df['Depression_Score'], df['Anxiety_Score'])
+
+    # Handle missing values
+    fills = fills or fill_values(df)
+    df['Sleep_Hours'] = df['Sleep_Hours'].fillna(fills['Sleep_Hours'])
+    df['Physical_Activity'] = fillna_category(df['Physical_Activity'], fills['Physical_Activity'])
+    df['Treatment'] = fillna_category(df['Treatment'], fills['Treatment'])
+    return df
+
+
+def encode_data(df):
+    """Label-encode the categorical columns; returns the frame and the fitted encoders."""
+    encoders = {}
+    for encoded_col, (source, key) in ENCODED_COLUMNS.items():
+        encoders[key] = LabelEncoder()
+        df[encoded_col] = encoders[key].fit_transform(df[source])
+    return df, encoders
+
 
 # ==================== TRAIN TEST SPLIT ====================
-X_train, X_test, y_risk_train, y_risk_test = train_test_split(
-    X, y_risk, test_size=0.2, random_state=42, stratify=y_risk
-)
-
-# ==================== MODEL TRAINING ====================
-print("\nTraining models for Risk Level prediction...")
-
-models = {
-    'Logistic Regression': LogisticRegression(max_iter=1000, random_state=42),
-    'Decision Tree': DecisionTreeClassifier(random_state=42, max_depth=10),
-    'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42, max_depth=15)
-}
-
-results = {}
-trained_models = {}
-
-for name, model in models.items():
-    print(f"\nTraining {name}...")
-    
-    # Train
-    model.fit(X_train, y_risk_train)
-    trained_models[name] = model
-    
-    # Predict
-    y_pred_train = model.predict(X_train)
-    y_pred_test = model.predict(X_test)
-    
-    # Evaluate
-    train_acc = accuracy_score(y_risk_train, y_pred_train)
-    test_acc = accuracy_score(y_risk_test, y_pred_test)
-    precision = precision_score(y_risk_test, y_pred_test, average='weighted', zero_division=0)
-    recall = recall_score(y_risk_test, y_pred_test, average='weighted', zero_division=0)
-    f1 = f1_score(y_risk_test, y_pred_test, average='weighted', zero_division=0)
-    
-    results[name] = {
-        'Train Accuracy': train_acc,
-        'Test Accuracy': test_acc,
-        'Precision': precision,
-        'Recall': recall,
-        'F1-Score': f1
+def split_data(df, targets=TARGETS):
+    """Train/test split of the features and the target columns, stratified on Risk_Level."""
+    X = df[feature_cols]
+    Y = df[list(targets)]
+    return train_test_split(X, Y, test_size=0.2, random_state=42, stratify=df['Risk_Level'])
+
+
+def risk_column(y):
+    """Risk_Level from a target frame, a 2-D prediction array or a plain 1-D y."""
+    if isinstance(y, pd.DataFrame):
+        return y['Risk_Level']
+    y = np.asarray(y)
+    return y[:, 0] if y.ndim == 2 else y
+
+
+def risk_accuracy(estimator, X, y):
+    """CV scorer: accuracy on Risk_Level for single- and multi-target candidates alike."""
+    return accuracy_score(risk_column(y), risk_column(estimator.predict(X)))
+
+
+# ==================== MODEL SELECTION ====================
+# Every candidate is tuned with stratified k-fold CV on the training split.
+# GridSearchCV fans the (params x folds) fits out across all cores via
+# joblib/loky, and the Random Forest itself also trains on every core. The
+# forest's grid stops at 100 trees of depth 15: deeper or larger forests score
+# within CV noise of it but double the artifact size and per-row latency.
+def candidate_models():
+    models = {
+        'Logistic Regression': LogisticRegression(max_iter=1000, random_state=42),
+        'Decision Tree': DecisionTreeClassifier(random_state=42, max_depth=10),
+        'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42, max_depth=15, n_jobs=-1)
+    }
+    param_grids = {
+        'Logistic Regression': {'C': [0.1, 1.0, 10.0]},
+        'Decision Tree': {'max_depth': [5, 10, 15, None], 'min_samples_leaf': [1, 5]},
+        'Random Forest': {'max_depth': [10, 15], 'min_samples_leaf': [1, 5]}
     }
-    
-    print(f"  Train Accuracy: {train_acc:.4f}")
-    print(f"  Test Accuracy: {test_acc:.4f}")
-    print(f"  Precision: {precision:.4f}")
-    print(f"  Recall: {recall:.4f}")
-    print(f"  F1-Score: {f1:.4f}")
-
-# ==================== SELECT BEST MODEL ====================
-best_model_name = max(results, key=lambda x: results[x]['Test Accuracy'])
-best_model = trained_models[best_model_name]
-
-print(f"\n{'='*50}")
-print(f"BEST MODEL: {best_model_name}")
-print(f"Test Accuracy: {results[best_model_name]['Test Accuracy']:.4f}")
-print(f"{'='*50}")
+    return models, param_grids
+
+
+def fit_models(X_train, Y_train, search=True, cv_folds=CV_FOLDS):
+    """Tune and fit every candidate; returns the fitted models and their CV (mean, std).
+
+    MULTI_TARGET candidates are fitted on every column of ``Y_train``, the
+    others on Risk_Level alone. With ``search=False`` each candidate is fitted
+    once with its default parameters and no CV, which keeps very large
+    benchmark runs tractable.
+    """
+    models, param_grids = candidate_models()
+    y_risk = risk_column(Y_train)
+    # Folds stratified on Risk_Level, shared by single- and multi-target candidates
+    folds = list(StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=42).split(X_train, y_risk))
+    trained_models = {}
+    cv_scores = {}
+
+    for name, model in models.items():
+        y = Y_train if name in MULTI_TARGET else y_risk
+        if not search:
+            print(f"\nFitting {name}...")
+            trained_models[name] = model.fit(X_train, y)
+            continue
+
+        print(f"\nTuning {name} ({cv_folds}-fold CV)...")
+        search_cv = GridSearchCV(model, param_grids[name], cv=folds, scoring=risk_accuracy, n_jobs=-1)
+        search_cv.fit(X_train, y)
+        trained_models[name] = search_cv.best_estimator_
+
+        cv_mean = search_cv.cv_results_['mean_test_score'][search_cv.best_index_]
+        cv_std = search_cv.cv_results_['std_test_score'][search_cv.best_index_]
+        cv_scores[name] = (cv_mean, cv_std)
+        print(f"  Best params: {search_cv.best_params_}")
+        print(f"  CV Accuracy: {cv_mean:.4f} ± {cv_std:.4f}")
+
+    return trained_models, cv_scores
+
+
+# ==================== EVALUATION ====================
+def evaluate_models(trained_models, cv_scores, X_train, X_test, Y_train, Y_test):
+    results = {}
+    y_train, y_test = risk_column(Y_train), risk_column(Y_test)
+    for name, model in trained_models.items():
+        # Predict
+        pred_test = model.predict(X_test)
+        y_pred_train = risk_column(model.predict(X_train))
+        y_pred_test = risk_column(pred_test)
+
+        # Evaluate
+        train_acc = accuracy_score(y_train, y_pred_train)
+        test_acc = accuracy_score(y_test, y_pred_test)
+        precision = precision_score(y_test, y_pred_test, average='weighted', zero_division=0)
+        recall = recall_score(y_test, y_pred_test, average='weighted', zero_division=0)
+        f1 = f1_score(y_test, y_pred_test, average='weighted', zero_division=0)
+
+        # Without a search, rank on test accuracy instead
+        cv_mean, cv_std = cv_scores.get(name, (test_acc, 0.0))
+        results[name] = {
+            'CV Accuracy': cv_mean,
+            'CV Std': cv_std,
+            'Train Accuracy': train_acc,
+            'Test Accuracy': test_acc,
+            'Precision': precision,
+            'Recall': recall,
+            'F1-Score': f1
+        }
+        # Multi-target candidates also report the levels they predict alongside risk
+        if np.ndim(pred_test) == 2 and isinstance(Y_test, pd.DataFrame):
+            for i, target in enumerate(Y_test.columns[1:], start=1):
+                results[name][f'{target} Accuracy'] = accuracy_score(Y_test[target], pred_test[:, i])
+
+        print(f"\n{name}")
+        print(f"  Train Accuracy: {train_acc:.4f}")
+        print(f"  Test Accuracy: {test_acc:.4f}")
+        print(f"  Precision: {precision:.4f}")
+        print(f"  Recall: {recall:.4f}")
+        print(f"  F1-Score: {f1:.4f}")
+        for key, value in results[name].items():
+            if key.endswith('_Level Accuracy'):
+                print(f"  {key}: {value:.4f}")
+    return results
+
+
+def select_best(results):
+    """Chosen on mean CV accuracy so the pick doesn't hinge on one random split"""
+    return max(results, key=lambda x: results[x]['CV Accuracy'])
+
 
 # ==================== SAVE MODELS & ENCODERS ====================
-print("\nSaving models and encoders...")
+def dump_artifacts(trained_models, best_model_name, encoders, model_dir='models', results=None,
+                   X_sample=None, holdout=None, max_loss=DEFAULT_MAX_LOSS, fills=None, distill=True):
+    """Write the flat artifacts, then publish them as a new bundle; returns its version.
+
+    With ``X_sample`` (e.g. the training features) the best model also gets a
+    rule cascade probed with those rows. Unless ``distill`` is False the
+    forest is also distilled into a small student that loses at most
+    ``max_loss`` risk accuracy on ``holdout`` = (X, y_risk), and its size,
+    load time and single-row latency are printed next to the forest's; this
+    labels ~200k synthetic rows and fits up to a dozen trees, so it is the
+    slowest part of the stage on small datasets. ``fills`` (from
+    fill_values) is saved for serving to apply to blank cells.
+    """
+    best_model = trained_models[best_model_name]
+
+    # Training used every core; single-row serving is faster without a thread pool
+    for model in trained_models.values():
+        if 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=None)
+
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(best_model, os.path.join(model_dir, 'best_risk_model.pkl'))
+    joblib.dump(trained_models['Random Forest'], os.path.join(model_dir, 'random_forest_model.pkl'))
+
+    # Save encoders for later use
+    joblib.dump(encoders, os.path.join(model_dir, 'encoders.pkl'))
+
+    # Save feature columns for app
+    joblib.dump(feature_cols, os.path.join(model_dir, 'feature_cols.pkl'))
+    if fills is not None:
+        save_fill_values(fills, model_dir)
+
+    # NumPy-only export of the best model for sklearn-free serving
+    export_model(best_model, encoders, feature_cols, os.path.join(model_dir, 'best_risk_model.npz'),
+                 targets=TARGETS)
+    # The forest's node arrays go out uncompressed so workers can mmap one shared copy
+    export_model(trained_models['Random Forest'], encoders, feature_cols,
+                 os.path.join(model_dir, 'random_forest_model'), targets=TARGETS)
+
+    # Score cells where the model always agrees with get_risk_level skip it at serve time
+    if X_sample is not None:
+        write_cascade(model_dir, 'best_risk_model', X_sample)
+    if X_sample is not None and distill:
+        # A tree-sized copy of the forest for hosts where its size or latency matters
+        X_ref, y_ref = holdout if holdout is not None else (None, None)
+        student = write_distilled(model_dir, 'random_forest_model', X_sample, X_ref, y_ref, max_loss)
+        if student is not None:
+            print_comparison(compare(model_dir, ('random_forest_model', student), X_sample))
+
+    # One immutable, checksummed copy that running apps pick up atomically
+    scores = (results or {}).get(best_model_name, {})
+    return publish(model_dir, best_model=best_model_name,
+                   metrics={k: float(v) for k, v in scores.items()})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train, select and save the MindScope risk models.")
+    parser.add_argument('--max-loss', type=float, default=DEFAULT_MAX_LOSS,
+                        help="risk accuracy the distilled forest may lose on the test split (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    print("Loading and cleaning data...")
+    df = load_data('Data/Global_Mental_Health_Dataset_2025.csv')
+    fills = fill_values(df)
+    df = clean_data(df, fills)
+    df, encoders = encode_data(df)
+    X_train, X_test, Y_train, Y_test = split_data(df)
+
+    print("\nSelecting models for Risk Level prediction...")
+    trained_models, cv_scores = fit_models(X_train, Y_train)
+    results = evaluate_models(trained_models, cv_scores, X_train, X_test, Y_train, Y_test)
 
-joblib.dump(best_model, 'models/best_risk_model.pkl')
-joblib.dump(trained_models['Random Forest'], 'models/random_forest_model.pkl')
+    best_model_name = select_best(results)
+    print(f"\n{'='*50}")
+    print(f"BEST MODEL: {best_model_name}")
+    print(f"CV Accuracy: {results[best_model_name]['CV Accuracy']:.4f} ± {results[best_model_name]['CV Std']:.4f}")
+    print(f"Test Accuracy: {results[best_model_name]['Test Accuracy']:.4f}")
+    print(f"{'='*50}")
 
-# Save encoders for later use
-encoders = {
-    'gender': le_gender,
-    'stress': le_stress,
-    'activity': le_activity,
-    'illness': le_illness,
-    'history': le_history,
-    'treatment': le_treatment,
-    'work': le_work
-}
+    print("\nSaving models and encoders...")
+    version = dump_artifacts(trained_models, best_model_name, encoders, results=results, X_sample=X_train,
+                             holdout=(X_test, Y_test['Risk_Level']), max_loss=args.max_loss, fills=fills)
 
-joblib.dump(encoders, 'models/encoders.pkl')
+    print("\n Models trained and saved successfully!")
+    print(f"Models saved in 'models/' directory (bundle {version} is now current)")
 
-# Save feature columns for app
-joblib.dump(feature_cols, 'models/feature_cols.pkl')
 
-print("\n Models trained and saved successfully!")
-print("Models saved in 'models/' directory")
+if __name__ == "__main__":
+    main()
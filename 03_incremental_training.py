@@ -0,0 +1,200 @@
+# Incremental Retraining Script for MindScope-2025
+# Updates a saved model from newly collected assessments without a full retrain
+#
+# Usage:
+#   python 03_incremental_training.py new_assessments.csv
+#   python 03_incremental_training.py new_assessments.csv --model random_forest_model --new-trees 25
+#   python 03_incremental_training.py new_assessments.csv --publish
+#
+# Forests are warm-started (new trees are grown on the new rows and added to the
+# ensemble); estimators with partial_fit are updated in place. Each run writes a
+# self-contained version under models/versions/<model>-<timestamp>/ that loads
+# with inference.load_artifacts(model_dir=<that directory>, model_name=<model>),
+# and the next run picks up from the latest version. Multi-target forests keep
+# learning all of inference.TARGETS from the new rows.
+#
+# A version is not served until it is published: --publish (or
+# `python bundle.py publish --overlay <version dir>`) bundles the current
+# artifacts with the updated model and encoders swapped in and moves
+# models/CURRENT to it, so the app, serve.py and score.py pick it up. The
+# app serves best_risk_model; when training selected Logistic Regression it
+# cannot be updated incrementally, so either serve the updated forest
+# (MINDSCOPE_MODEL=random_forest_model) or rerun 02_model_training.py.
+
+import argparse
+import copy
+import glob
+import os
+import warnings
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from bundle import publish, resolve_model_dir
+from clinical import get_anxiety_level, get_depression_level, get_risk_level
+from compiled_model import export_model
+from inference import ENCODED_COLUMNS, MODEL_DIR, TARGETS, load_fill_values, save_fill_values
+from ingest import read_dataset, fillna_category
+
+warnings.filterwarnings('ignore')
+
+VERSIONS_DIR = os.path.join(MODEL_DIR, 'versions')
+
+
+# ==================== ARTIFACTS ====================
+def latest_version(model_name, versions_dir=VERSIONS_DIR):
+    """Most recent version directory for a model, or None if there is none yet."""
+    candidates = sorted(glob.glob(os.path.join(versions_dir, f'{model_name}-*')))
+    return candidates[-1] if candidates else None
+
+
+def load_base(model_dir, model_name):
+    model = joblib.load(os.path.join(model_dir, f'{model_name}.pkl'))
+    encoders = joblib.load(os.path.join(model_dir, 'encoders.pkl'))
+    feature_cols = joblib.load(os.path.join(model_dir, 'feature_cols.pkl'))
+    return model, encoders, feature_cols
+
+
+def save_version(model, encoders, feature_cols, model_name, fills, versions_dir=VERSIONS_DIR):
+    """Write model, encoders, fill values, feature order and the NumPy export to a new version directory."""
+    os.makedirs(versions_dir, exist_ok=True)
+    while True:
+        # Microseconds keep names unique (and in sort order) across runs in the same second;
+        # os.mkdir claims the name atomically, so a concurrent run that lands on it just retries
+        version = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        path = os.path.join(versions_dir, f'{model_name}-{version}')
+        try:
+            os.mkdir(path)
+            break
+        except FileExistsError:
+            continue
+    joblib.dump(model, os.path.join(path, f'{model_name}.pkl'))
+    joblib.dump(encoders, os.path.join(path, 'encoders.pkl'))
+    joblib.dump(feature_cols, os.path.join(path, 'feature_cols.pkl'))
+    save_fill_values(fills, path)
+    export = model_name if hasattr(model, 'estimators_') else f'{model_name}.npz'
+    export_model(model, encoders, feature_cols, os.path.join(path, export), targets=TARGETS)
+    return path
+
+
+# ==================== ENCODERS ====================
+def extend_encoder(encoder, values):
+    """Append categories the encoder has never seen, keeping existing codes stable.
+
+    Re-fitting would re-sort classes_ and silently shift the codes the saved
+    model was trained on, so new labels are only ever added at the end.
+    Returns the (copied) encoder and the list of labels added.
+    """
+    known = set(encoder.classes_.tolist())
+    new = [v for v in pd.unique(pd.Series(values).dropna()) if v not in known]
+    if new:
+        encoder = copy.deepcopy(encoder)
+        encoder.classes_ = np.concatenate([np.asarray(encoder.classes_, dtype=object),
+                                           np.asarray(new, dtype=object)])
+    return encoder, new
+
+
+# ==================== DATA ====================
+def base_fill_values(model_dir, df):
+    """The base's saved fill values; bases saved before they were recorded use the new rows' median / mode."""
+    return {
+        'Sleep_Hours': float(df['Sleep_Hours'].median()),
+        'Physical_Activity': str(df['Physical_Activity'].mode()[0]),
+        **load_fill_values(model_dir),
+    }
+
+
+def prepare_rows(df, encoders, fills):
+    """Clean and encode new assessment rows the same way 02_model_training.py does."""
+    df['Risk_Level'] = get_risk_level(df['Depression_Score'], df['Anxiety_Score'])
+    df['Depression_Level'] = get_depression_level(df['Depression_Score'])
+    df['Anxiety_Level'] = get_anxiety_level(df['Anxiety_Score'])
+    df['Sleep_Hours'] = df['Sleep_Hours'].fillna(fills['Sleep_Hours'])
+    df['Physical_Activity'] = fillna_category(df['Physical_Activity'], fills['Physical_Activity'])
+    df['Treatment'] = fillna_category(df['Treatment'], fills['Treatment'])
+
+    encoders = dict(encoders)
+    for encoded_col, (source, key) in ENCODED_COLUMNS.items():
+        encoders[key], added = extend_encoder(encoders[key], df[source])
+        if added:
+            print(f"  New {source} categories: {added}")
+        df[encoded_col] = encoders[key].transform(df[source])
+    return df, encoders
+
+
+# ==================== UPDATE ====================
+def is_multi_target(model):
+    """True for estimators fitted on every column of TARGETS at once."""
+    return isinstance(model.classes_, list)
+
+
+def update_model(model, X, y, new_trees=20):
+    """Update a fitted model from new rows: warm-start forests, partial_fit otherwise."""
+    model = copy.deepcopy(model)
+    if is_multi_target(model):
+        missing = {lvl for classes, col in zip(model.classes_, y) for lvl in set(classes) - set(y[col])}
+    else:
+        missing = set(model.classes_) - set(np.unique(y))
+    if hasattr(model, 'estimators_'):
+        # Every tree must vote over the same classes_ as the existing ensemble
+        if missing:
+            raise ValueError(f"new rows lack levels {sorted(missing)}; "
+                             "collect more rows before growing the forest")
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + new_trees)
+        model.fit(X, y)
+        model.set_params(warm_start=False)
+    elif hasattr(model, 'partial_fit'):
+        model.partial_fit(X, y, classes=model.classes_)
+    else:
+        raise TypeError(f"{type(model).__name__} supports neither warm-started trees nor partial_fit; "
+                        "update the forest (--model random_forest_model) and serve it with "
+                        "MINDSCOPE_MODEL=random_forest_model, or rerun 02_model_training.py")
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update a saved MindScope model from new assessment rows.")
+    parser.add_argument('input', help="CSV of new assessments with the dataset's columns")
+    parser.add_argument('--model', default='random_forest_model', help="artifact to update (default %(default)s)")
+    parser.add_argument('--base', help="directory to start from (default: latest version, else the served bundle)")
+    parser.add_argument('--new-trees', type=int, default=20, help="trees added to a forest per update")
+    parser.add_argument('--publish', action='store_true',
+                        help="publish the updated model as the current bundle so the app and CLIs serve it")
+    args = parser.parse_args(argv)
+
+    base = args.base or latest_version(args.model) or resolve_model_dir(MODEL_DIR)
+    print(f"Loading {args.model} from {base}...")
+    model, encoders, feature_cols = load_base(base, args.model)
+
+    print(f"Reading new assessments from {args.input}...")
+    df = read_dataset(args.input, cache=False)
+    fills = base_fill_values(base, df)
+    df, encoders = prepare_rows(df, encoders, fills)
+    X = df[feature_cols]
+    y = df[list(TARGETS)] if is_multi_target(model) else df['Risk_Level']
+    print(f"  {len(df)} rows")
+
+    # Compared on Risk_Level, the first target, for single- and multi-target models alike
+    risk = df['Risk_Level'].to_numpy()
+    before = (np.asarray(model.predict(X)).reshape(len(X), -1)[:, 0] == risk).mean()
+    try:
+        model = update_model(model, X, y, args.new_trees)
+    except (TypeError, ValueError) as e:
+        raise SystemExit(f"Cannot update {args.model}: {e}")
+    after = (np.asarray(model.predict(X)).reshape(len(X), -1)[:, 0] == risk).mean()
+    print(f"  Risk accuracy on new rows: {before:.4f} -> {after:.4f}")
+
+    path = save_version(model, encoders, feature_cols, args.model, fills)
+    print(f"\n Updated model saved to '{path}'")
+    if args.publish:
+        # Its rule cascade and lookup table no longer match the model, so serving skips them until rebuilt
+        version = publish(MODEL_DIR, overlay=path, updated_model=args.model, rows=len(df))
+        print(f" Published bundle {version}")
+    else:
+        print(f" Not served yet: publish it with --publish or `python bundle.py publish --overlay {path}`")
+
+
+if __name__ == "__main__":
+    main()
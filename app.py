@@ -6,10 +6,15 @@ display headings, organic soft cards, and a guided step-by-step assessment wizar
 Model & clinical logic unchanged.
 """
 
-import numpy as np
-import joblib
+import functools
+import math
+import os
+
 import streamlit as st
-import plotly.graph_objects as go
+
+import metrics
+from clinical import get_depression_level, get_anxiety_level
+from metrics import inc
 
 
 # ==================== PAGE CONFIG ====================
@@ -20,16 +25,6 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
-# SEO + Open Graph / Twitter meta. Single source of truth in og_meta.html, which is
-# also injected into Streamlit's served index.html at build time (see Dockerfile) so
-# social crawlers — which don't run JS — can read the share-card tags.
-try:
-    with open("og_meta.html", encoding="utf-8") as _f:
-        st.markdown(_f.read(), unsafe_allow_html=True)
-except FileNotFoundError:
-    pass
-
-
 # ==================== DESIGN TOKENS (Warm Wellness) ====================
 CANVAS   = "#FBF7F0"   # warm sand
 SURFACE  = "#FFFFFF"
@@ -54,326 +49,105 @@ def icon(name, fill=False):
     return f'<i class="{"ph-fill" if fill else "ph"} ph-{name}"></i>'
 
 
-# ==================== GLOBAL STYLES ====================
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Fraunces:opsz,wght@9..144,400;9..144,500;9..144,600;9..144,700&family=Nunito+Sans:wght@400;500;600;700;800&display=swap');
-@import url('https://cdn.jsdelivr.net/npm/@phosphor-icons/web@2.1.1/src/regular/style.css');
-@import url('https://cdn.jsdelivr.net/npm/@phosphor-icons/web@2.1.1/src/fill/style.css');
-
-:root { --serif: 'Fraunces', Georgia, 'Times New Roman', serif; }
-
-html, body, [class*="css"], .stApp, [data-testid="stMarkdownContainer"], input, button, select, textarea {
-    font-family: 'Nunito Sans', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-}
-[class^="ph"], [class*=" ph"] { line-height: 1; vertical-align: middle; }
-
-/* ---------- Ambient background ---------- */
-html, body, .stApp { overflow-x: hidden; }
-.stApp {
-    background-color: #FBF7F0;
-    background-image:
-        radial-gradient(circle at 14% 15%, rgba(124,148,115,0.16), transparent 36%),
-        radial-gradient(circle at 86% 9%,  rgba(194,112,61,0.11),  transparent 38%),
-        radial-gradient(circle at 83% 85%, rgba(124,148,115,0.14), transparent 40%),
-        radial-gradient(circle at 15% 90%, rgba(194,112,61,0.09),  transparent 38%),
-        radial-gradient(rgba(95,80,55,0.035) 1px, transparent 1px);
-    background-size: 100% 100%, 100% 100%, 100% 100%, 100% 100%, 26px 26px;
-    background-position: 0 0, 0 0, 0 0, 0 0, 0 0;
-    background-attachment: fixed;
-}
-/* soft organic blobs floating in the gutters, behind the content */
-.stApp::before, .stApp::after {
-    content: ""; position: fixed; z-index: 0; pointer-events: none;
-    border-radius: 46% 54% 58% 42% / 52% 44% 56% 48%;
-    filter: blur(16px);
-}
-.stApp::before {
-    top: 130px; left: -50px; width: 230px; height: 230px;
-    background: radial-gradient(circle, rgba(124,148,115,0.22), transparent 68%);
-}
-.stApp::after {
-    bottom: 90px; right: -60px; width: 300px; height: 300px;
-    background: radial-gradient(circle, rgba(194,112,61,0.17), transparent 70%);
-}
-
-.block-container {
-    position: relative;
-    z-index: 1;
-    max-width: 880px !important;
-    padding-top: 1.2rem !important;
-    padding-bottom: 3rem !important;
-}
-
-#MainMenu, footer, header [data-testid="stToolbar"] { visibility: hidden; }
-.stActionButton { display: none; }
-
-/* ---------- Brand header ---------- */
-.ms-nav {
-    display: flex; align-items: center; justify-content: space-between;
-    padding: 16px 22px; margin: 0 0 6px;
-    background: #FFFFFF; border: 1px solid #ECE4D8;
-    border-radius: 20px; box-shadow: 0 10px 30px -22px rgba(95,80,55,.4);
-}
-.ms-brand { display: flex; align-items: center; gap: 13px; }
-.ms-logo {
-    width: 44px; height: 44px; border-radius: 50% 50% 50% 12px;
-    background: linear-gradient(135deg, #93A985, #5F7A57);
-    display: flex; align-items: center; justify-content: center;
-    color: #fff; font-size: 1.4rem; box-shadow: 0 8px 18px -6px rgba(95,122,87,.55);
-}
-.ms-brand-name { font-family: var(--serif); font-size: 1.34rem; font-weight: 600; color: #2E2A24; letter-spacing: -.01em; line-height: 1.05; }
-.ms-brand-tag  { font-size: .68rem; font-weight: 700; color: #A89F92; letter-spacing: .18em; text-transform: uppercase; margin-top: 2px; }
-.ms-nav-chip {
-    font-size: .68rem; font-weight: 700; color: #5F7A57; letter-spacing: .06em;
-    background: #EEF3E9; border: 1px solid #DCE7D4; padding: 8px 13px; border-radius: 999px;
-    display: inline-flex; align-items: center; gap: 7px;
-}
-
-/* ---------- Wizard progress ---------- */
-.wz-prog { display: flex; gap: 8px; margin: 8px 0 6px; }
-.wz-seg { flex: 1; height: 9px; border-radius: 999px; background: #ECE4D8; transition: all .25s ease; }
-.wz-seg.done { background: #7C9473; }
-.wz-seg.active { background: #7C9473; box-shadow: 0 0 0 4px rgba(124,148,115,.18); }
-.wz-meta { font-size: .76rem; font-weight: 800; color: #5F7A57; letter-spacing: .12em; text-transform: uppercase; margin-bottom: 12px; }
-
-/* ---------- Hero ---------- */
-.ms-hero {
-    position: relative; overflow: hidden;
-    background: linear-gradient(135deg, #5F7A57 0%, #7C9473 58%, #93A985 100%);
-    border-radius: 30px; padding: 50px 44px; margin: 14px 0 18px;
-    box-shadow: 0 30px 60px -30px rgba(95,122,87,.7);
-}
-.ms-hero::before {
-    content: ""; position: absolute; right: -60px; bottom: -90px;
-    width: 260px; height: 260px; border-radius: 47% 53% 60% 40%;
-    background: rgba(194,112,61,.22);
-}
-.ms-hero::after {
-    content: ""; position: absolute; right: -40px; top: -80px;
-    width: 200px; height: 200px; border-radius: 50%;
-    background: radial-gradient(circle, rgba(255,255,255,.2), transparent 70%);
-}
-.ms-hero-badge {
-    position: relative; display: inline-flex; align-items: center; gap: 8px;
-    font-size: .68rem; font-weight: 800; letter-spacing: .14em;
-    color: #FBF7F0; background: rgba(255,255,255,.14); border: 1px solid rgba(255,255,255,.28);
-    padding: 7px 14px; border-radius: 999px; margin-bottom: 18px;
-}
-.ms-hero h1 { position: relative; font-family: var(--serif); color: #FFFFFF; font-size: 2.7rem; font-weight: 600; line-height: 1.08; letter-spacing: -.01em; margin: 0 0 14px; }
-.ms-hero p  { position: relative; color: #EAF0E5; font-size: 1.04rem; line-height: 1.65; margin: 0; max-width: 600px; }
-
-/* ---------- Section header ---------- */
-.ms-sec { display: flex; align-items: center; gap: 13px; margin: 2px 0 6px; }
-.ms-sec-ic {
-    width: 42px; height: 42px; border-radius: 50% 50% 50% 14px; flex: none;
-    background: #EEF3E9; color: #5F7A57; font-size: 1.25rem;
-    display: flex; align-items: center; justify-content: center;
-}
-.ms-sec-tt { font-family: var(--serif); font-size: 1.3rem; font-weight: 600; color: #2E2A24; line-height: 1.15; }
-.ms-sec-sb { font-size: .84rem; color: #A89F92; margin-top: 2px; }
-
-/* feature grid */
-.ms-grid { display: grid; grid-template-columns: repeat(3, 1fr); gap: 16px; margin: 4px 0 6px; }
-.ms-feat { background: #FFFFFF; border: 1px solid #ECE4D8; border-radius: 22px; padding: 24px; box-shadow: 0 14px 30px -26px rgba(95,80,55,.5); }
-.ms-feat-ic {
-    width: 50px; height: 50px; border-radius: 50% 50% 50% 16px; font-size: 1.55rem;
-    display: flex; align-items: center; justify-content: center; margin-bottom: 14px;
-}
-.ms-feat h4 { font-family: var(--serif); color: #2E2A24; font-size: 1.1rem; font-weight: 600; margin: 0 0 5px; }
-.ms-feat p  { color: #6B6258; font-size: .86rem; line-height: 1.55; margin: 0; }
-
-/* how it works */
-.ms-steplist { display: grid; grid-template-columns: repeat(4, 1fr); gap: 13px; }
-.ms-howstep { background: #FFFFFF; border: 1px solid #ECE4D8; border-radius: 18px; padding: 18px; }
-.ms-howstep .b {
-    width: 30px; height: 30px; border-radius: 50% 50% 50% 10px; background: #EEF3E9; color: #5F7A57;
-    font-family: var(--serif); font-weight: 700; font-size: 1.05rem; display: flex; align-items: center; justify-content: center; margin-bottom: 11px;
-}
-.ms-howstep h5 { font-family: var(--serif); color: #2E2A24; font-size: .98rem; font-weight: 600; margin: 0 0 3px; }
-.ms-howstep p  { color: #6B6258; font-size: .8rem; line-height: 1.5; margin: 0; }
-
-/* risk banner */
-.ms-risk { border-radius: 24px; padding: 30px 32px; display: flex; align-items: center; gap: 22px; }
-.ms-risk-badge {
-    width: 66px; height: 66px; border-radius: 50% 50% 50% 18px; flex: none; font-size: 2.1rem;
-    display: flex; align-items: center; justify-content: center; background: rgba(255,255,255,.55);
-}
-.ms-risk-kicker { font-size: .7rem; font-weight: 800; letter-spacing: .14em; opacity: .85; text-transform: uppercase; }
-.ms-risk h2 { font-family: var(--serif); font-size: 1.6rem; font-weight: 600; margin: 5px 0; letter-spacing: -.01em; }
-.ms-risk p  { font-size: .92rem; line-height: 1.55; margin: 0; opacity: .92; }
-
-/* recommendation cards */
-.ms-rec-head { display: flex; align-items: center; gap: 12px; margin-bottom: 11px; }
-.ms-rec-ic {
-    width: 38px; height: 38px; border-radius: 50% 50% 50% 12px; flex: none; font-size: 1.15rem;
-    background: #EEF3E9; color: #5F7A57; display: flex; align-items: center; justify-content: center;
-}
-.ms-rec-tt { font-family: var(--serif); font-size: 1.08rem; font-weight: 600; color: #2E2A24; }
-.ms-tip { display: flex; align-items: flex-start; gap: 10px; font-size: .88rem; color: #6B6258; line-height: 1.55; padding: 5px 0; }
-.ms-tip i { color: #7C9473; font-size: 1.1rem; margin-top: 1px; flex: none; }
-
-/* disclaimer + footer */
-.ms-disc {
-    background: #FBF0E6; border: 1px solid #EAD7C2; border-radius: 18px;
-    padding: 16px 20px; color: #8A4B22; font-size: .84rem; line-height: 1.55;
-    display: flex; gap: 11px; align-items: flex-start;
-}
-.ms-disc i { font-size: 1.25rem; margin-top: 1px; flex: none; }
-.ms-foot {
-    background: #2E2A24; border-radius: 26px; padding: 32px 34px; margin-top: 24px; color: #D8CFC2;
-}
-.ms-foot .ttl { font-family: var(--serif); color: #FBF7F0; font-weight: 600; font-size: 1.25rem; display: flex; align-items: center; gap: 11px; }
-.ms-foot p { font-size: .84rem; line-height: 1.6; color: #A89F92; margin: 10px 0 0; }
-.ms-foot a { color: #C7D6BD; text-decoration: none; font-weight: 700; }
-.ms-foot a:hover { color: #E3EBD9; }
-.ms-foot hr { border: none; border-top: 1px solid #46403A; margin: 18px 0; }
-.ms-foot .copy { font-size: .76rem; color: #7A7066; }
-
-/* ---------- Streamlit widget polish ---------- */
-div.stButton > button {
-    border-radius: 14px; font-weight: 700; border: 1.5px solid #E2D9CB;
-    background: #FFFFFF; color: #5F574C; transition: all .15s ease; padding: .6rem 1.1rem;
-}
-div.stButton > button:hover { border-color: #C7D6BD; color: #5F7A57; background: #FAFBF8; }
-div.stButton > button[kind="primary"] {
-    background: linear-gradient(135deg, #7C9473, #5F7A57); color: #FFFFFF; border: none;
-    font-weight: 800; box-shadow: 0 12px 26px -12px rgba(95,122,87,.85);
-}
-div.stButton > button[kind="primary"]:hover {
-    background: linear-gradient(135deg, #6B8463, #557049);
-    box-shadow: 0 16px 32px -12px rgba(95,122,87,1); transform: translateY(-1px);
-}
-
-/* inputs */
-.stSelectbox label, .stNumberInput label, .stSlider label, .stRadio > label {
-    font-weight: 700 !important; color: #5F574C !important; font-size: .87rem !important;
-}
-[data-baseweb="select"] > div, .stNumberInput input {
-    border-radius: 12px !important; border-color: #E2D9CB !important; background: #FFFFFF !important;
-}
-[data-testid="stWidgetLabel"] p { font-weight: 700; color: #5F574C; }
-
-/* radio group as graded chips: calm -> intense (sage -> sand -> tan -> clay) */
-div[role="radiogroup"] { gap: 8px; flex-wrap: wrap; }
-div[role="radiogroup"] input[type="radio"] { accent-color: #5F7A57; }
-div[role="radiogroup"] label {
-    border: 1.5px solid #E8DECF; border-radius: 999px;
-    padding: 9px 16px; margin: 0 !important; font-weight: 700; color: #5F574C;
-    transition: all .14s ease;
-}
-div[role="radiogroup"] label:nth-child(1) { background: #EFF4EA; border-color: #D7E3CE; }
-div[role="radiogroup"] label:nth-child(2) { background: #F5F1E5; border-color: #E8DEC8; }
-div[role="radiogroup"] label:nth-child(3) { background: #F7EAD8; border-color: #ECD5B6; }
-div[role="radiogroup"] label:nth-child(4) { background: #F7E1D3; border-color: #EAC6AC; }
-div[role="radiogroup"] label:hover { transform: translateY(-1px); border-color: #C7B79F; }
-div[role="radiogroup"] label:has(input:checked) {
-    color: #2E2A24; font-weight: 800; transform: translateY(-1px);
-    box-shadow: inset 0 0 0 2px rgba(46,42,36,.28), 0 10px 20px -10px rgba(95,80,55,.55);
-}
-
-/* metric cards */
-[data-testid="stMetric"] {
-    background: #FFFFFF; border: 1px solid #ECE4D8; border-radius: 20px;
-    padding: 20px 22px; box-shadow: 0 14px 30px -26px rgba(95,80,55,.5);
-}
-[data-testid="stMetricLabel"] p { color: #A89F92; font-weight: 700; font-size: .78rem; letter-spacing: .03em; }
-[data-testid="stMetricValue"] { font-family: var(--serif); color: #2E2A24; font-weight: 600; }
-
-/* bordered containers (wizard / cards) */
-[data-testid="stVerticalBlockBorderWrapper"] {
-    background: #FFFFFF; border-radius: 24px; border-color: #ECE4D8 !important;
-    box-shadow: 0 18px 40px -30px rgba(95,80,55,.55);
-}
-[data-testid="stVerticalBlockBorderWrapper"] > div { padding: 4px; }
-
-/* alerts */
-[data-testid="stAlert"] { border-radius: 14px; }
-
-/* question label */
-.ms-q { font-weight: 700; color: #3D372F; font-size: .93rem; margin: 4px 0 4px; }
-.ms-q .qn { font-family: var(--serif); color: #5F7A57; font-weight: 700; margin-right: 7px; }
-
-/* running-score card (PHQ / GAD) */
-.ms-score {
-    display: flex; align-items: center; gap: 16px;
-    background: linear-gradient(135deg, #F3F7EF, #EEF3E9);
-    border: 1px solid #DCE7D4; border-radius: 18px; padding: 16px 20px;
-}
-.ms-score-ic {
-    width: 44px; height: 44px; border-radius: 50% 50% 50% 14px; flex: none; font-size: 1.3rem;
-    background: #FFFFFF; color: #5F7A57; display: flex; align-items: center; justify-content: center;
-    box-shadow: 0 6px 14px -8px rgba(95,122,87,.6);
-}
-.ms-score-lbl { font-size: .72rem; font-weight: 800; letter-spacing: .12em; text-transform: uppercase; color: #7C9473; }
-.ms-score-val { font-family: var(--serif); font-size: 1.45rem; font-weight: 600; color: #2E2A24; line-height: 1.1; }
-.ms-score-val small { font-size: .9rem; color: #A89F92; font-weight: 600; }
-.ms-score-band {
-    margin-left: auto; font-size: .82rem; font-weight: 800; color: #2E2A24;
-    background: #FFFFFF; border: 1px solid #DCE7D4; border-radius: 999px; padding: 7px 15px; white-space: nowrap;
-}
+# ==================== GLOBAL STYLES & META ====================
+# SEO + Open Graph / Twitter meta live in og_meta.html and the stylesheet in
+# assets/style.css. The Docker image bakes both into Streamlit's served
+# index.html (see Dockerfile) and sets MINDSCOPE_STATIC_HEAD=1, so social
+# crawlers — which don't run JS — can read the share-card tags and reruns don't
+# re-send the stylesheet. Elsewhere they are injected inline on every rerun,
+# read from disk only once per process.
+STATIC_HEAD = os.environ.get("MINDSCOPE_STATIC_HEAD", "") not in ("", "0")
 
-/* ------------------------- Mobile ------------------------- */
-@media (max-width: 640px) {
-    .block-container { padding-top: 0.85rem !important; padding-bottom: 2rem !important; }
 
-    /* brand header: hide the decorative chip, tighten */
-    .ms-nav { padding: 13px 16px; border-radius: 16px; }
-    .ms-brand-name { font-size: 1.2rem; }
-    .ms-nav-chip { display: none; }
-
-    /* hero scales down */
-    .ms-hero { padding: 30px 22px; border-radius: 24px; }
-    .ms-hero h1 { font-size: 1.95rem; }
-    .ms-hero p  { font-size: .96rem; }
-
-    /* multi-column grids collapse to one column */
-    .ms-grid, .ms-steplist { grid-template-columns: 1fr; }
-
-    /* section headers */
-    .ms-sec-tt { font-size: 1.18rem; }
-    .ms-sec-ic { width: 38px; height: 38px; font-size: 1.1rem; }
+def _read_text(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
 
-    /* comfortable inner card padding on narrow screens */
-    [data-testid="stVerticalBlockBorderWrapper"] > div { padding: 1rem; }
 
-    /* tighten stacked column gaps (top nav, inputs, metrics) */
-    [data-testid="stHorizontalBlock"] { gap: 0.5rem; }
+@functools.cache
+def head_html():
+    """og_meta.html plus the global stylesheet as one markdown payload."""
+    return _read_text("og_meta.html") + f"<style>\n{_read_text('assets/style.css')}</style>"
 
-    /* answer chips: clean two-per-row, equal width, single line */
-    div[role="radiogroup"] label { flex: 1 1 42%; min-width: 88px; padding: 8px 10px; font-size: 0.82rem; }
-    div[role="radiogroup"] label p { font-size: 0.82rem; margin: 0; }
 
-    /* running-score card wraps gracefully (long severity bands) */
-    .ms-score { padding: 14px 16px; gap: 12px; flex-wrap: wrap; }
+def inject_head():
+    if not STATIC_HEAD:
+        st.markdown(head_html(), unsafe_allow_html=True)
 
-    /* risk banner: tighter on small screens */
-    .ms-risk { padding: 22px 20px; gap: 16px; border-radius: 20px; }
-    .ms-risk-badge { width: 54px; height: 54px; font-size: 1.7rem; }
-    .ms-risk h2 { font-size: 1.35rem; }
-    .ms-risk-kicker { font-size: .64rem; }
 
-    /* recommendations + footer */
-    .ms-tip { font-size: .85rem; }
-    .ms-foot { padding: 24px 22px; border-radius: 20px; }
-    .ms-foot .ttl { font-size: 1.1rem; }
-}
-</style>
-""", unsafe_allow_html=True)
+# ==================== LOAD MODELS & ENCODERS ====================
+# inference (pandas, joblib) and the artifacts load on a background thread that
+# starts with the first script run, so the home page paints without waiting
+# for them; only submitting the assessment blocks on the result. The same
+# thread then watches models/CURRENT and swaps in bundles published by
+# 02_model_training.py (every MINDSCOPE_RELOAD_SECONDS, 0 = never).
+RELOAD_SECONDS = float(os.environ.get("MINDSCOPE_RELOAD_SECONDS", "30"))
+# Model calls from every session go through one shared queue that coalesces
+# them into batches, scored in MINDSCOPE_INFERENCE_WORKERS worker processes so
+# sessions don't serialize on the GIL (0 = score batches in this process).
+INFERENCE_WORKERS = int(os.environ.get("MINDSCOPE_INFERENCE_WORKERS", min(4, (os.cpu_count() or 1) - 1)))
+
+
+def _load_artifacts(model_dir, pool, cache):
+    from cascade import load_cascade
+    from inference import DEFAULT_MODEL, InferencePool, MicroBatcher, load_artifacts, model_version
+    from lookup_table import load_risk_table
+    model, encoders, feature_cols = load_artifacts(model_dir)
+    version = model_version(model_dir)
+    metrics.set_model_version(version, DEFAULT_MODEL)
+    if INFERENCE_WORKERS and not pool:
+        pool.append(InferencePool(INFERENCE_WORKERS, model_dir))
+        pool[0].warm_up()
+    return MicroBatcher(model, encoders, feature_cols, max_wait=0.002, cache=cache, version=version,
+                        table=load_risk_table(model_dir, model=model),
+                        cascade=load_cascade(feature_cols, model_dir),
+                        pool=pool[0] if pool else None, model_dir=model_dir)
+
+
+def _release_artifacts(batcher):
+    # Stops the replaced bundle's batcher thread; sessions still holding it score inline
+    batcher.close()
+
+
+@st.cache_resource(show_spinner=False)
+def model_watcher():
+    """Start the artifact load once per process; returns the BundleWatcher holding it."""
+    from bundle import BundleWatcher
+    from inference import PredictionCache
+    pool = []  # the InferencePool, started by the first load and shared by every bundle after it
+    # Process-wide LRU of recent predictions shared by every session and bundle (keyed on model version)
+    cache = PredictionCache(maxsize=4096)
+    metrics.track_cache(cache)
+    return BundleWatcher(functools.partial(_load_artifacts, pool=pool, cache=cache), interval=RELOAD_SECONDS,
+                         release=_release_artifacts)
 
 
-# ==================== LOAD MODELS & ENCODERS ====================
-@st.cache_resource
 def load_models():
-    """Load pre-trained models and encoders"""
+    """Batcher answering every session: rule cascade, prediction cache and lookup table
+    first, then model calls queued into shared batches.
+
+    One snapshot per assessment: a bundle swapped in meanwhile serves the next one.
+    """
     try:
-        model = joblib.load('models/best_risk_model.pkl')
-        encoders = joblib.load('models/encoders.pkl')
-        feature_cols = joblib.load('models/feature_cols.pkl')
-        return model, encoders, feature_cols
+        return model_watcher().get()
     except FileNotFoundError:
+        model_watcher.clear()  # retry on the next run once the models exist
         st.error("Models not found. Please run '02_model_training.py' first to train models.")
         st.stop()
+    except Exception as e:
+        # A corrupt or incompatible artifact must not stay cached for the life of the process
+        model_watcher.clear()
+        st.error(f"Could not load the models: {e}")
+        st.stop()
+
+
+@st.cache_resource(show_spinner=False)
+def start_metrics():
+    """Start the MINDSCOPE_METRICS_* exporters once per process (no-op unless enabled)."""
+    metrics.start_from_env()
 
 
 # ==================== SOLUTIONS DATABASE ====================
@@ -463,11 +237,6 @@ SOLUTIONS_DB = {
 }
 
 
-# ==================== CLINICAL THRESHOLDS ====================
-PHQ9_THRESHOLDS = {'Minimal': (0, 4), 'Mild': (5, 9), 'Moderate': (10, 14), 'Moderately Severe': (15, 19), 'Severe': (20, 27)}
-GAD7_THRESHOLDS = {'Minimal': (0, 4), 'Mild': (5, 9), 'Moderate': (10, 14), 'Severe': (15, 21)}
-
-
 # ==================== PHQ-9 & GAD-7 QUESTIONS ====================
 PHQ9_QUESTIONS = [
     "Little interest or pleasure in doing things",
@@ -495,90 +264,38 @@ PHQ_OPTIONS = {0: "Not really", 1: "Here & there", 2: "Quite a lot", 3: "Nearly
 
 
 # ==================== HELPER FUNCTIONS ====================
-def get_depression_level(score):
-    if score <= 4:
-        return 'Minimal'
-    elif score <= 9:
-        return 'Mild'
-    elif score <= 14:
-        return 'Moderate'
-    elif score <= 19:
-        return 'Moderately Severe'
-    else:
-        return 'Severe'
-
-
-def get_anxiety_level(score):
-    if score <= 4:
-        return 'Minimal'
-    elif score <= 9:
-        return 'Mild'
-    elif score <= 14:
-        return 'Moderate'
-    else:
-        return 'Severe'
-
-
-def get_risk_level(dep_score, anx_score):
-    risk = (dep_score + anx_score) / 2
-    if risk < 5:
-        return 'Low'
-    elif risk < 12:
-        return 'Moderate'
-    else:
-        return 'High'
-
-
-def _safe_transform(encoder, value):
-    """Encode a single label, falling back to a known class if unseen.
-
-    The saved encoders were trained on a subset of the UI options (e.g. gender
-    only saw Male/Female). This keeps the inclusive dropdowns from crashing
-    prediction when a not-seen-in-training option is chosen.
-    """
-    classes = list(encoder.classes_)
-    if value in classes:
-        return int(encoder.transform([value])[0])
-    return int(encoder.transform([classes[0]])[0])
-
-
-def encode_features(gender, stress, activity, illness, history, treatment, work, encoders):
+def predict_risk(age, gender, dep_score, anx_score, stress, sleep, activity,
+                 illness, history, treatment, treatment_days, work, batcher):
+    """(risk level, risk probabilities, {target: level}) — the dict holds the model's
+    Depression_Level and Anxiety_Level when the served model predicts them, else it is empty."""
+    # Keyed by dataset column; the assembler orders it by the saved feature_cols
+    record = {
+        'Age': age, 'Gender': gender, 'Depression_Score': dep_score, 'Anxiety_Score': anx_score,
+        'Stress_Level': stress, 'Sleep_Hours': sleep, 'Physical_Activity': activity,
+        'Chronic_Illness': illness, 'Mental_Health_History': history, 'Treatment': treatment,
+        'Days_of_Treatment': treatment_days, 'Work_Status': work,
+    }
     try:
-        return [
-            _safe_transform(encoders['gender'], gender),
-            _safe_transform(encoders['stress'], stress),
-            _safe_transform(encoders['activity'], activity),
-            _safe_transform(encoders['illness'], illness),
-            _safe_transform(encoders['history'], history),
-            _safe_transform(encoders['treatment'], treatment),
-            _safe_transform(encoders['work'], work),
-        ]
-    except Exception as e:
+        future = batcher.submit(record, raw=True)
+    except ValueError as e:
+        inc('mindscope_prediction_errors_total')
         st.error(f"Encoding error: {e}")
         return None
-
-
-def predict_risk(age, gender, dep_score, anx_score, stress, sleep, activity,
-                 illness, history, treatment, treatment_days, work, model, encoders, feature_cols):
     try:
-        encoded = encode_features(gender, stress, activity, illness, history, treatment, work, encoders)
-        if encoded is None:
-            return None
-
-        features = np.array([[
-            age, encoded[0], dep_score, anx_score, encoded[1], sleep,
-            encoded[2], encoded[3], encoded[4], encoded[5], treatment_days, encoded[6]
-        ]])
-
-        prediction = model.predict(features)[0]
-        probability = model.predict_proba(features)[0]
-        return prediction, probability
+        return future.result()
     except Exception as e:
+        # Already counted by the batcher
         st.error(f"Prediction error: {e}")
         return None
 
 
 # ==================== WIZARD STATE ====================
+# Each wizard step is an st.form by default, so answers are sent once per step
+# rather than one script rerun per click. MINDSCOPE_WIZARD_FORMS=0 restores
+# per-click reruns (and the live PHQ-9 / GAD-7 score cards).
+WIZARD_FORMS = os.environ.get("MINDSCOPE_WIZARD_FORMS", "1") != "0"
+
+
 def fresh_answers():
     return {
         'age': 25, 'gender': 'Male', 'work': 'Student',
@@ -603,8 +320,11 @@ def _seed(key, default):
 
 
 # ==================== UI BUILDING BLOCKS ====================
-def render_header():
-    st.markdown(f"""
+# Fragments that only depend on their arguments are built once per process
+# (functools.cache) instead of re-formatted on every rerun.
+@functools.cache
+def header_html():
+    return f"""
     <div class="ms-nav">
       <div class="ms-brand">
         <div class="ms-logo">{icon("leaf", fill=True)}</div>
@@ -615,7 +335,11 @@ def render_header():
       </div>
       <div class="ms-nav-chip">{icon("heartbeat")} PHQ-9 &nbsp;·&nbsp; GAD-7 &nbsp;·&nbsp; AI</div>
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+
+def render_header():
+    st.markdown(header_html(), unsafe_allow_html=True)
 
 
 def render_nav(active_page):
@@ -637,19 +361,28 @@ def render_nav(active_page):
             st.rerun()
 
 
-def section_header(icon_name, title, subtitle=""):
+@functools.cache
+def section_header_html(icon_name, title, subtitle=""):
     sub = f'<div class="ms-sec-sb">{subtitle}</div>' if subtitle else ""
-    st.markdown(f"""
+    return f"""
     <div class="ms-sec">
       <div class="ms-sec-ic">{icon(icon_name)}</div>
       <div><div class="ms-sec-tt">{title}</div>{sub}</div>
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+
+def section_header(icon_name, title, subtitle=""):
+    st.markdown(section_header_html(icon_name, title, subtitle), unsafe_allow_html=True)
+
+
+@functools.cache
+def disclaimer_html(html):
+    return f'<div class="ms-disc">{icon("warning-circle", fill=True)}<div>{html}</div></div>'
 
 
 def disclaimer(html):
-    st.markdown(f'<div class="ms-disc">{icon("warning-circle", fill=True)}<div>{html}</div></div>',
-                unsafe_allow_html=True)
+    st.markdown(disclaimer_html(html), unsafe_allow_html=True)
 
 
 def render_score_card(label, score, out_of, band, glyph):
@@ -665,8 +398,9 @@ def render_score_card(label, score, out_of, band, glyph):
     """, unsafe_allow_html=True)
 
 
-def render_footer():
-    st.markdown(f"""
+@functools.cache
+def footer_html():
+    return f"""
     <div class="ms-foot">
       <div class="ttl">{icon("leaf", fill=True)} MindScope-2025</div>
       <p>An AI-driven mental wellbeing assessment that helps you understand your emotional health using
@@ -680,7 +414,11 @@ def render_footer():
       </p>
       <p class="copy" style="margin-top:14px;">© 2025 MindScope · Built by Haroon K M</p>
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+
+def render_footer():
+    st.markdown(footer_html(), unsafe_allow_html=True)
 
 
 def render_risk_banner(risk_level, confidence_pct):
@@ -698,88 +436,144 @@ def render_risk_banner(risk_level, confidence_pct):
     """, unsafe_allow_html=True)
 
 
+@functools.cache
+def solutions_html(risk_level):
+    """(heading, tips) HTML for each recommendation card of a risk level."""
+    cards = []
+    for solution in SOLUTIONS_DB[risk_level]['solutions']:
+        head = (f'<div class="ms-rec-head"><div class="ms-rec-ic">{icon(solution["icon"])}</div>'
+                f'<div class="ms-rec-tt">{solution["category"]}</div></div>')
+        tips = "".join(
+            f'<div class="ms-tip">{icon("check-circle", fill=True)}<span>{tip}</span></div>'
+            for tip in solution['tips']
+        )
+        cards.append((head, tips))
+    return tuple(cards)
+
+
 def display_solutions(risk_level):
     section_header("list-checks", "Recommended Actions",
                    "Personalized guidance based on your assessed risk level.")
-    for solution in SOLUTIONS_DB[risk_level]['solutions']:
+    for head, tips in solutions_html(risk_level):
         with st.container(border=True):
-            st.markdown(
-                f'<div class="ms-rec-head"><div class="ms-rec-ic">{icon(solution["icon"])}</div>'
-                f'<div class="ms-rec-tt">{solution["category"]}</div></div>',
-                unsafe_allow_html=True,
-            )
-            tips_html = "".join(
-                f'<div class="ms-tip">{icon("check-circle", fill=True)}<span>{tip}</span></div>'
-                for tip in solution['tips']
-            )
-            st.markdown(tips_html, unsafe_allow_html=True)
-
-
-def display_assessment_results(phq9_score, gad7_score, risk_level, model_confidence):
+            st.markdown(head, unsafe_allow_html=True)
+            st.markdown(tips, unsafe_allow_html=True)
+
+
+# ==================== GAUGES ====================
+# Only 28 PHQ-9 and 22 GAD-7 values exist, so each gauge is built once per
+# process and reused. MINDSCOPE_GAUGES=svg swaps Plotly for a static SVG gauge.
+GAUGE_MODE = os.environ.get("MINDSCOPE_GAUGES", "plotly")
+
+GAUGES = {
+    'phq9': {
+        'title': "Depression (PHQ-9)", 'max': 27, 'bar': SAGE, 'threshold': 20,
+        'steps': [((0, 4), "#E3EBD9"), ((5, 9), "#F1E7D3"), ((10, 14), "#F0D8BD"),
+                  ((15, 19), "#E9C2A4"), ((20, 27), "#DFA98C")],
+    },
+    'gad7': {
+        'title': "Anxiety (GAD-7)", 'max': 21, 'bar': CLAY, 'threshold': 15,
+        'steps': [((0, 4), "#E3EBD9"), ((5, 9), "#F1E7D3"), ((10, 14), "#F0D8BD"),
+                  ((15, 21), "#DFA98C")],
+    },
+}
+
+
+@functools.cache
+def gauge_figure(scale, score):
+    """Plotly gauge for one score; cached, so treat the figure as read-only."""
+    import plotly.graph_objects as go  # only the results page needs Plotly
+
+    spec = GAUGES[scale]
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number", value=score,
+        title={"text": spec['title'], "font": {"size": 15, "color": BODY}},
+        domain={'x': [0, 1], 'y': [0, 1]},
+        gauge={
+            'axis': {'range': [0, spec['max']], 'tickcolor': MUTED},
+            'bar': {'color': spec['bar']}, 'borderwidth': 0,
+            'steps': [{'range': list(rng), 'color': color} for rng, color in spec['steps']],
+            'threshold': {'line': {'color': CLAY, 'width': 3}, 'thickness': 0.75, 'value': spec['threshold']}
+        }
+    ))
+    fig.update_layout(
+        height=300, margin=dict(l=20, r=20, t=50, b=10),
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font=dict(family="Nunito Sans, sans-serif", color=INK),
+    )
+    return fig
+
+
+def _arc(lo, hi, radius, cx=120, cy=130):
+    """SVG path of the gauge arc between fractions lo and hi (0 = left end)."""
+    a0, a1 = math.pi * (1 - lo), math.pi * (1 - hi)
+    x0, y0 = cx + radius * math.cos(a0), cy - radius * math.sin(a0)
+    x1, y1 = cx + radius * math.cos(a1), cy - radius * math.sin(a1)
+    return f'M{x0:.2f},{y0:.2f} A{radius},{radius} 0 0 1 {x1:.2f},{y1:.2f}'
+
+
+@functools.cache
+def gauge_svg(scale, score):
+    """Plotly-free gauge with the same bands, bar and threshold, as inline SVG."""
+    spec = GAUGES[scale]
+    top = spec['max']
+    bands = "".join(
+        f'<path d="{_arc(lo / top, hi / top, 80)}" stroke="{color}" stroke-width="34" fill="none"/>'
+        for (lo, hi), color in spec['steps']
+    )
+    bar = (f'<path d="{_arc(0, score / top, 80)}" stroke="{spec["bar"]}" stroke-width="10" fill="none"/>'
+           if score else "")
+    t = math.pi * (1 - spec['threshold'] / top)
+    mark = (f'<line x1="{120 + 63 * math.cos(t):.2f}" y1="{130 - 63 * math.sin(t):.2f}" '
+            f'x2="{120 + 97 * math.cos(t):.2f}" y2="{130 - 97 * math.sin(t):.2f}" '
+            f'stroke="{CLAY}" stroke-width="3"/>')
+    return f"""
+    <div style="text-align:center;">
+      <div style="font-size:15px; color:{BODY}; margin-bottom:4px;">{spec['title']}</div>
+      <svg viewBox="0 0 240 150" width="100%" style="max-width:320px;" role="img"
+           aria-label="{spec['title']}: {score} of {top}">
+        {bands}{bar}{mark}
+        <text x="120" y="128" text-anchor="middle" font-family="Nunito Sans, sans-serif"
+              font-size="40" fill="{INK}">{score}</text>
+        <text x="34" y="146" text-anchor="middle" font-size="11" fill="{MUTED}">0</text>
+        <text x="206" y="146" text-anchor="middle" font-size="11" fill="{MUTED}">{top}</text>
+      </svg>
+    </div>
+    """
+
+
+def render_gauge(scale, score):
+    if GAUGE_MODE == "svg":
+        st.markdown(gauge_svg(scale, int(score)), unsafe_allow_html=True)
+    else:
+        st.plotly_chart(gauge_figure(scale, int(score)), use_container_width=True)
+
+
+def display_assessment_results(phq9_score, gad7_score, risk_level, model_confidence, levels=None):
+    # Bands predicted by a multi-target model, else the clinical cut-offs
+    levels = levels or {}
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("PHQ-9 · Depression", f"{phq9_score}/27",
-                  f"{get_depression_level(phq9_score)}", delta_color="inverse")
+                  f"{levels.get('Depression_Level') or get_depression_level(phq9_score)}", delta_color="inverse")
     with col2:
         st.metric("GAD-7 · Anxiety", f"{gad7_score}/21",
-                  f"{get_anxiety_level(gad7_score)}", delta_color="inverse")
+                  f"{levels.get('Anxiety_Level') or get_anxiety_level(gad7_score)}", delta_color="inverse")
     with col3:
         confidence_pct = max(model_confidence) * 100
         st.metric("Overall Risk", f"{risk_level}", f"Confidence {confidence_pct:.1f}%")
 
     col_chart1, col_chart2 = st.columns(2)
-
-    def _style(fig):
-        fig.update_layout(
-            height=300, margin=dict(l=20, r=20, t=50, b=10),
-            paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
-            font=dict(family="Nunito Sans, sans-serif", color=INK),
-        )
-        return fig
-
     with col_chart1:
-        fig_phq = go.Figure(go.Indicator(
-            mode="gauge+number", value=phq9_score,
-            title={"text": "Depression (PHQ-9)", "font": {"size": 15, "color": BODY}},
-            domain={'x': [0, 1], 'y': [0, 1]},
-            gauge={
-                'axis': {'range': [0, 27], 'tickcolor': MUTED},
-                'bar': {'color': SAGE}, 'borderwidth': 0,
-                'steps': [
-                    {'range': [0, 4], 'color': "#E3EBD9"},
-                    {'range': [5, 9], 'color': "#F1E7D3"},
-                    {'range': [10, 14], 'color': "#F0D8BD"},
-                    {'range': [15, 19], 'color': "#E9C2A4"},
-                    {'range': [20, 27], 'color': "#DFA98C"}
-                ],
-                'threshold': {'line': {'color': CLAY, 'width': 3}, 'thickness': 0.75, 'value': 20}
-            }
-        ))
-        st.plotly_chart(_style(fig_phq), use_container_width=True)
-
+        render_gauge('phq9', phq9_score)
     with col_chart2:
-        fig_gad = go.Figure(go.Indicator(
-            mode="gauge+number", value=gad7_score,
-            title={"text": "Anxiety (GAD-7)", "font": {"size": 15, "color": BODY}},
-            domain={'x': [0, 1], 'y': [0, 1]},
-            gauge={
-                'axis': {'range': [0, 21], 'tickcolor': MUTED},
-                'bar': {'color': CLAY}, 'borderwidth': 0,
-                'steps': [
-                    {'range': [0, 4], 'color': "#E3EBD9"},
-                    {'range': [5, 9], 'color': "#F1E7D3"},
-                    {'range': [10, 14], 'color': "#F0D8BD"},
-                    {'range': [15, 21], 'color': "#DFA98C"}
-                ],
-                'threshold': {'line': {'color': CLAY, 'width': 3}, 'thickness': 0.75, 'value': 15}
-            }
-        ))
-        st.plotly_chart(_style(fig_gad), use_container_width=True)
+        render_gauge('gad7', gad7_score)
 
 
 # ==================== PAGES ====================
-def page_home():
-    st.markdown(f"""
+@functools.cache
+def home_hero_html():
+    return f"""
     <div class="ms-hero">
       <span class="ms-hero-badge">{icon("sparkle", fill=True)} A CALMER WAY TO CHECK IN</span>
       <h1>Understand your mind,<br>gently and clearly</h1>
@@ -787,22 +581,12 @@ def page_home():
          learning model to offer a confidential, evidence-based reflection on your wellbeing —
          in just a few quiet minutes.</p>
     </div>
-    """, unsafe_allow_html=True)
-
-    c1, c2, _ = st.columns([1.5, 1, 1.2])
-    with c1:
-        if st.button("Begin Assessment", type="primary", use_container_width=True):
-            reset_assessment()
-            st.session_state.page = "screening"
-            st.rerun()
-    with c2:
-        if st.button("Learn More", use_container_width=True):
-            st.session_state.page = "about"
-            st.rerun()
+    """
 
-    st.markdown("<div style='height:8px'></div>", unsafe_allow_html=True)
 
-    st.markdown(f"""
+@functools.cache
+def home_features_html():
+    return f"""
     <div class="ms-grid">
       <div class="ms-feat">
         <div class="ms-feat-ic" style="background:#EEF3E9;color:#5F7A57;">{icon("stethoscope")}</div>
@@ -820,7 +604,25 @@ def page_home():
         <p>Your answers are processed in-session for your result. Nothing is stored or shared.</p>
       </div>
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+
+def page_home():
+    st.markdown(home_hero_html(), unsafe_allow_html=True)
+
+    c1, c2, _ = st.columns([1.5, 1, 1.2])
+    with c1:
+        if st.button("Begin Assessment", type="primary", use_container_width=True):
+            reset_assessment()
+            st.session_state.page = "screening"
+            st.rerun()
+    with c2:
+        if st.button("Learn More", use_container_width=True):
+            st.session_state.page = "about"
+            st.rerun()
+
+    st.markdown("<div style='height:8px'></div>", unsafe_allow_html=True)
+    st.markdown(home_features_html(), unsafe_allow_html=True)
 
     st.markdown("<div style='height:12px'></div>", unsafe_allow_html=True)
     section_header("path", "How It Works", "From a few gentle questions to personalized guidance.")
@@ -868,8 +670,9 @@ def _step_phq(ans):
         )
         if i < len(PHQ9_QUESTIONS) - 1:
             st.markdown("<div style='height:4px'></div>", unsafe_allow_html=True)
-    score = sum(ans['phq9'])
-    render_score_card("Your PHQ-9 so far", score, 27, get_depression_level(score), "cloud-rain")
+    if not WIZARD_FORMS:
+        score = sum(ans['phq9'])
+        render_score_card("Your PHQ-9 so far", score, 27, get_depression_level(score), "cloud-rain")
 
 
 def _step_gad(ans):
@@ -885,8 +688,9 @@ def _step_gad(ans):
         )
         if i < len(GAD7_QUESTIONS) - 1:
             st.markdown("<div style='height:4px'></div>", unsafe_allow_html=True)
-    score = sum(ans['gad7'])
-    render_score_card("Your GAD-7 so far", score, 21, get_anxiety_level(score), "wind")
+    if not WIZARD_FORMS:
+        score = sum(ans['gad7'])
+        render_score_card("Your GAD-7 so far", score, 21, get_anxiety_level(score), "wind")
 
 
 def _step_lifestyle(ans):
@@ -927,7 +731,18 @@ WIZARD_STEPS = [
 ]
 
 
-def page_screening(model, encoders, feature_cols):
+def _wizard_nav(step, total, button):
+    """Back/Cancel and Continue/Analyze buttons; returns which one was clicked."""
+    c1, c2 = st.columns(2)
+    with c1:
+        back = button("Back" if step > 1 else "Cancel", use_container_width=True)
+    with c2:
+        forward = button("Continue" if step < total else "Analyze & Get Results",
+                         type="primary", use_container_width=True)
+    return back, forward
+
+
+def page_screening():
     if 'ans' not in st.session_state:
         st.session_state.ans = fresh_answers()
     if 'wiz_step' not in st.session_state:
@@ -953,46 +768,49 @@ def page_screening(model, encoders, feature_cols):
     st.markdown(f'<div class="wz-prog">{segs}</div>'
                 f'<div class="wz-meta">Step {step} of {total} · {label}</div>', unsafe_allow_html=True)
 
-    with st.container(border=True):
-        render_step(ans)
-
-    st.markdown("<div style='height:10px'></div>", unsafe_allow_html=True)
+    # In form mode a step's answers stay in the browser until one of its
+    # buttons submits them, instead of rerunning the script on every click.
+    if WIZARD_FORMS:
+        with st.form(f"wizard_step_{step}", border=True):
+            render_step(ans)
+            st.markdown("<div style='height:10px'></div>", unsafe_allow_html=True)
+            back, forward = _wizard_nav(step, total, st.form_submit_button)
+    else:
+        with st.container(border=True):
+            render_step(ans)
+        st.markdown("<div style='height:10px'></div>", unsafe_allow_html=True)
+        back, forward = _wizard_nav(step, total, st.button)
 
-    # navigation
-    c1, c2 = st.columns(2)
-    with c1:
+    if back:
         if step > 1:
-            if st.button("Back", use_container_width=True):
-                st.session_state.wiz_step = step - 1
-                st.rerun()
+            st.session_state.wiz_step = step - 1
         else:
-            if st.button("Cancel", use_container_width=True):
-                st.session_state.page = "home"
-                st.rerun()
-    with c2:
+            st.session_state.page = "home"
+        st.rerun()
+    if forward:
         if step < total:
-            if st.button("Continue", type="primary", use_container_width=True):
-                st.session_state.wiz_step = step + 1
-                st.rerun()
+            st.session_state.wiz_step = step + 1
+            st.rerun()
         else:
-            if st.button("Analyze & Get Results", type="primary", use_container_width=True):
-                with st.spinner("Reflecting on your responses..."):
-                    phq9_score = sum(ans['phq9'])
-                    gad7_score = sum(ans['gad7'])
-                    prediction = predict_risk(
-                        ans['age'], ans['gender'], phq9_score, gad7_score, ans['stress'],
-                        ans['sleep'], ans['activity'], ans['chronic'], ans['history'],
-                        ans['treatment'], ans['tdays'], ans['work'], model, encoders, feature_cols
-                    )
-                    if prediction:
-                        risk_level, probabilities = prediction
-                        st.session_state.test_complete = True
-                        st.session_state.phq9_score = phq9_score
-                        st.session_state.gad7_score = gad7_score
-                        st.session_state.risk_level = risk_level
-                        st.session_state.probabilities = probabilities
-                        st.session_state.page = "results"
-                        st.rerun()
+            with st.spinner("Reflecting on your responses..."):
+                batcher = load_models()
+                phq9_score = sum(ans['phq9'])
+                gad7_score = sum(ans['gad7'])
+                prediction = predict_risk(
+                    ans['age'], ans['gender'], phq9_score, gad7_score, ans['stress'],
+                    ans['sleep'], ans['activity'], ans['chronic'], ans['history'],
+                    ans['treatment'], ans['tdays'], ans['work'], batcher
+                )
+                if prediction:
+                    risk_level, probabilities, levels = prediction
+                    st.session_state.test_complete = True
+                    st.session_state.phq9_score = phq9_score
+                    st.session_state.gad7_score = gad7_score
+                    st.session_state.risk_level = risk_level
+                    st.session_state.probabilities = probabilities
+                    st.session_state.levels = levels
+                    st.session_state.page = "results"
+                    st.rerun()
 
 
 def page_results():
@@ -1013,7 +831,7 @@ def page_results():
     st.markdown("<div style='height:10px'></div>", unsafe_allow_html=True)
     display_assessment_results(
         st.session_state.phq9_score, st.session_state.gad7_score,
-        st.session_state.risk_level, st.session_state.probabilities,
+        st.session_state.risk_level, st.session_state.probabilities, st.session_state.get('levels'),
     )
 
     st.markdown("<div style='height:10px'></div>", unsafe_allow_html=True)
@@ -1083,7 +901,9 @@ combined with machine learning. It is designed for awareness and education — n
 
 # ==================== MAIN APP ====================
 def main():
-    model, encoders, feature_cols = load_models()
+    inject_head()
+    start_metrics()
+    model_watcher()
 
     if "page" not in st.session_state:
         st.session_state.page = "home"
@@ -1095,7 +915,7 @@ def main():
     if page == "home":
         page_home()
     elif page == "screening":
-        page_screening(model, encoders, feature_cols)
+        page_screening()
     elif page == "results":
         page_results()
     elif page == "about":
@@ -0,0 +1,202 @@
+"""
+MindScope-2025 — inference benchmarks.
+
+Times the serving path end to end: feature encoding, single-row and batched
+predict_proba for every saved model under both engines, artifact load time
+and a headless Streamlit run of the assessment wizard. Results are written
+as JSON so two commits can be compared.
+
+Usage:
+    python benchmark.py -o bench.json
+    python benchmark.py -o after.json --compare before.json
+    python benchmark.py --skip-app --batch-sizes 256 10000
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from bundle import resolve_model_dir
+from inference import MODEL_DIR, build_feature_matrix, encode_record, feature_assembler, load_artifacts
+from ingest import DATASET_PATH, read_dataset
+from timing import bench_load, engines, measure
+
+warnings.filterwarnings('ignore')
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+NON_MODEL_PICKLES = {'encoders', 'feature_cols'}
+# Slower than this factor of the baseline median counts as a regression in --compare
+REGRESSION_RATIO = 1.10
+
+
+def _max_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+# ==================== BENCHMARKS ====================
+def saved_models(model_dir=MODEL_DIR):
+    """Model artifact stems saved by 02_model_training.py (pickle or NumPy export)."""
+    names = set()
+    for entry in os.listdir(model_dir):
+        stem, ext = os.path.splitext(entry)
+        if '.' in stem:
+            continue  # side artifacts such as <model>.cascade.npz
+        if ext in ('.pkl', '.npz') or (not ext and os.path.isdir(os.path.join(model_dir, entry))):
+            names.add(stem)
+    names -= NON_MODEL_PICKLES
+    names -= {'versions', 'bundles'}
+    return sorted(names)
+
+
+def bench_encoding(frame, encoders, feature_cols, repeat):
+    records = frame.to_dict('records')
+    key = 'stress'
+    labels = [r['Stress_Level'] for r in records]
+    assembler = feature_assembler(encoders, feature_cols)
+    i = iter(range(10 ** 12))
+    return {
+        'encode/FeatureAssembler.encode': measure(
+            lambda: assembler.encode(records[next(i) % len(records)]), repeat),
+        'encode/LookupEncoder.encode': measure(
+            lambda: encoders[key].encode(labels[next(i) % len(labels)]), repeat),
+        'encode/encode_record': measure(
+            lambda: encode_record(records[next(i) % len(records)], encoders, feature_cols), repeat),
+        f'encode/build_feature_matrix/{len(frame)}': measure(
+            lambda: build_feature_matrix(frame, encoders, feature_cols), repeat=max(repeat // 20, 5)),
+    }
+
+
+def bench_predict(model, X, batch_sizes, repeat):
+    results = {}
+    i = iter(range(10 ** 12))
+    results['single'] = measure(lambda: model.predict_proba(X[[next(i) % len(X)]]), repeat)
+    for n in batch_sizes:
+        batch = X[:n]
+        stats = measure(lambda: model.predict_proba(batch), repeat=max(repeat // 20, 5))
+        stats['rows_per_s'] = n / (stats['median_us'] / 1e6)
+        results[f'batch/{len(batch)}'] = stats
+    return results
+
+
+def bench_app(runs=3):
+    """Headless AppTest run of the wizard: cold first paint, then full assessments."""
+    from streamlit.testing.v1 import AppTest
+
+    def click(at, label):
+        next(b for b in at.button if b.label.startswith(label)).click().run()
+
+    start = time.perf_counter()
+    at = AppTest.from_file(APP_PATH, default_timeout=120).run()
+    first_paint = time.perf_counter() - start
+
+    submit, total = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        click(at, 'Assessment' if at.session_state.page != 'results' else 'Take Assessment Again')
+        for _ in range(3):
+            click(at, 'Continue')
+        t = time.perf_counter()
+        click(at, 'Analyze')
+        submit.append(time.perf_counter() - t)
+        total.append(time.perf_counter() - start)
+        if at.exception or at.session_state.page != 'results':
+            raise RuntimeError(f"assessment did not reach the results page: {at.exception}")
+    return {
+        'app/first_paint': {'seconds': first_paint, 'median_us': first_paint * 1e6},
+        # The first submit includes waiting for the background model load
+        'app/submit': {'seconds': submit, 'median_us': float(np.median(submit[1:] or submit)) * 1e6},
+        'app/assessment': {'seconds': total, 'median_us': float(np.median(total)) * 1e6},
+    }
+
+
+# ==================== REPORT ====================
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {'python': platform.python_version(), 'numpy': np.__version__}
+    for module in ('sklearn', 'pandas', 'streamlit'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    return {'commit': commit, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'machine': platform.machine(), 'cpus': os.cpu_count(), 'versions': versions}
+
+
+def compare(results, baseline):
+    """Print median latency against a baseline run, flagging regressions."""
+    print(f"\n{'benchmark':<55}{'before':>12}{'after':>12}{'ratio':>8}")
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if not old or 'median_us' not in stats or 'median_us' not in old:
+            continue
+        ratio = stats['median_us'] / old['median_us']
+        flag = '  <-- slower' if ratio > REGRESSION_RATIO else ''
+        print(f"{name:<55}{old['median_us']:>10.1f}us{stats['median_us']:>10.1f}us{ratio:>8.2f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MindScope encoding, prediction and app latency.")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="JSON results file")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    parser.add_argument('--models', default=MODEL_DIR, help="directory with the saved artifacts")
+    parser.add_argument('--data', default=DATASET_PATH, help="dataset-shaped CSV to draw inputs from")
+    parser.add_argument('--rows', type=int, default=10_000, help="input rows sampled from --data")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[256, 10_000],
+                        help="batch sizes for predict_proba (default 256 10000)")
+    parser.add_argument('--repeat', type=int, default=500, help="timed calls per single-row benchmark")
+    parser.add_argument('--app-runs', type=int, default=3, help="full assessments in the AppTest run")
+    parser.add_argument('--skip-app', action='store_true', help="skip the headless Streamlit run")
+    args = parser.parse_args(argv)
+    args.models = resolve_model_dir(args.models)
+
+    frame = read_dataset(args.data).head(args.rows)
+    results = {}
+
+    for model_name in saved_models(args.models):
+        for engine in engines(args.models, model_name):
+            prefix = f'{model_name}/{engine}'
+            print(f"Benchmarking {prefix}...", file=sys.stderr)
+            results[f'load/{prefix}'] = bench_load(args.models, model_name, engine)
+            model, encoders, feature_cols = load_artifacts(args.models, engine, model_name)
+            X = build_feature_matrix(frame, encoders, feature_cols)
+            for name, stats in bench_predict(model, X, args.batch_sizes, args.repeat).items():
+                results[f'predict/{prefix}/{name}'] = stats
+
+    model, encoders, feature_cols = load_artifacts(args.models)
+    results.update(bench_encoding(frame, encoders, feature_cols, args.repeat))
+
+    if not args.skip_app:
+        print("Running the app headless...", file=sys.stderr)
+        results.update(bench_app(args.app_runs))
+
+    report = {'environment': environment(), 'max_rss_mb': _max_rss_mb(), 'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, stats in results.items():
+        if 'median_us' in stats:
+            print(f"{name:<55}{stats['median_us']:>12.1f}us")
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)['results'])
+
+
+if __name__ == "__main__":
+    main()
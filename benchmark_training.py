@@ -0,0 +1,206 @@
+"""
+MindScope-2025 — training pipeline benchmark at scaled dataset sizes.
+
+Generates synthetic data with the schema of
+Data/Global_Mental_Health_Dataset_2025.csv at each requested size, runs the
+stages of 02_model_training.py (load, clean, encode, split, fit, evaluate,
+dump) on it and reports wall time and peak resident memory per stage. Dump
+includes building the rule cascade and distilling the forest (distill.py).
+Distilling labels ~200k synthetic rows whatever the dataset size, so it
+dominates dump on small runs (about 35 s at 3,000 rows); --no-distill
+skips it.
+
+Usage:
+    python benchmark_training.py                       # 10k, 100k, 1M, 10M rows
+    python benchmark_training.py --sizes 10000 100000 --search
+    python benchmark_training.py --sizes 1000000 -o training_bench.json
+    python benchmark_training.py --sizes 10000 --no-distill
+
+The full grid search (--search) refits every candidate params x folds times
+and is only practical up to a few hundred thousand rows; by default each
+candidate is fitted once with its default parameters.
+"""
+
+import argparse
+import contextlib
+import gc
+import importlib
+import io
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+training = importlib.import_module('02_model_training')
+
+
+# Category frequencies of the 2025 dataset (None = blank cell)
+CATEGORIES = {
+    'Gender': {'Female': .504, 'Male': .496},
+    'Country': {c: .1 for c in ['Germany', 'South Africa', 'France', 'Japan', 'Canada', 'Brazil',
+                                'India', 'United Kingdom', 'United States', 'Australia']},
+    'Stress_Level': {'Medium': .352, 'High': .268, 'Low': .239, 'Severe': .141},
+    'Physical_Activity': {'Moderate': .343, 'Low': .306, None: .191, 'High': .160},
+    'Chronic_Illness': {'No': .696, 'Yes': .304},
+    'Mental_Health_History': {'No': .591, 'Yes': .409},
+    'Treatment': {'Therapy': .307, 'Medication': .254, None: .243, 'Both': .196},
+    'Outcome': {'Good': .351, 'Fair': .308, 'Poor': .198, 'Excellent': .143},
+    'Work_Status': {'Employed': .468, 'Student': .259, 'Unemployed': .187, 'Retired': .086},
+}
+
+COLUMNS = ['Patient_ID', 'Age', 'Gender', 'Country', 'Depression_Score', 'Anxiety_Score',
+           'Stress_Level', 'Sleep_Hours', 'Physical_Activity', 'Chronic_Illness',
+           'Mental_Health_History', 'Treatment', 'Days_of_Treatment', 'Outcome', 'Work_Status']
+
+STAGES = ['load', 'clean', 'encode', 'split', 'fit', 'evaluate', 'dump']
+
+
+# ==================== SYNTHETIC DATA ====================
+def synthetic_chunk(start, n, rng):
+    data = {
+        'Patient_ID': [f'MH{i:08d}' for i in range(start + 1, start + n + 1)],
+        'Age': rng.integers(18, 81, n),
+        'Depression_Score': rng.integers(0, 28, n),
+        'Anxiety_Score': rng.integers(0, 22, n),
+        'Sleep_Hours': np.round(rng.uniform(3, 12, n), 1),
+        'Days_of_Treatment': rng.integers(0, 366, n),
+    }
+    for col, freqs in CATEGORIES.items():
+        labels = np.array([v if v is not None else np.nan for v in freqs], dtype=object)
+        p = np.fromiter(freqs.values(), dtype=float)
+        data[col] = labels[rng.choice(len(labels), n, p=p / p.sum())]
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def write_synthetic(path, rows, chunk=1_000_000, seed=42):
+    """Write a dataset-shaped CSV of ``rows`` rows in chunks."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunk):
+        frame = synthetic_chunk(start, min(chunk, rows - start), rng)
+        frame.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+# ==================== MEASUREMENT ====================
+def _rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+
+
+class StageMeter:
+    """Wall time and peak RSS of one stage, sampling /proc/self/statm on a thread.
+
+    Where /proc is unavailable it falls back to ru_maxrss, which is the
+    process-wide peak rather than the stage's own.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.proc = os.path.exists('/proc/self/statm')
+
+    def __enter__(self):
+        gc.collect()
+        self.start_mb = self.peak_mb = _rss_mb() if self.proc else 0.0
+        self._stop = threading.Event()
+        if self.proc:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        self.t0 = time.perf_counter()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, _rss_mb())
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.t0
+        self._stop.set()
+        if self.proc:
+            self._thread.join()
+            self.peak_mb = max(self.peak_mb, _rss_mb())
+        else:
+            scale = 1 if sys.platform == 'darwin' else 1024
+            self.peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+        return False
+
+    def result(self):
+        return {'seconds': self.seconds, 'peak_rss_mb': self.peak_mb,
+                'peak_over_start_mb': self.peak_mb - self.start_mb}
+
+
+# ==================== PIPELINE ====================
+def run_pipeline(csv_path, model_dir, search=False, chunksize=None, distill=True):
+    """Run every training stage on one CSV; returns {stage: measurements}."""
+    report = {}
+    state = {}
+
+    def stage(name, fn):
+        with StageMeter() as meter, contextlib.redirect_stdout(io.StringIO()):
+            state[name] = fn()
+        report[name] = meter.result()
+        print(f"  {name:<9}{meter.seconds:>10.2f}s{meter.peak_mb:>10.0f} MB peak", file=sys.stderr)
+
+    stage('load', lambda: training.load_data(csv_path, chunksize=chunksize, cache=False))
+    stage('clean', lambda: training.clean_data(state['load']))
+    stage('encode', lambda: training.encode_data(state['clean']))
+    df, encoders = state['encode']
+    stage('split', lambda: training.split_data(df))
+    X_train, X_test, y_train, y_test = state['split']
+    stage('fit', lambda: training.fit_models(X_train, y_train, search=search))
+    trained_models, cv_scores = state['fit']
+    stage('evaluate', lambda: training.evaluate_models(trained_models, cv_scores,
+                                                       X_train, X_test, y_train, y_test))
+    best = training.select_best(state['evaluate'])
+    stage('dump', lambda: training.dump_artifacts(trained_models, best, encoders, model_dir,
+                                                  X_sample=X_train, fills=training.fill_values(df),
+                                                  distill=distill))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and memory-profile each training stage at scale.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000, 10_000_000],
+                        help="synthetic dataset sizes in rows (default 10k 100k 1M 10M)")
+    parser.add_argument('--search', action='store_true',
+                        help="run the full CV grid search instead of one default fit per model")
+    parser.add_argument('--chunksize', type=int, help="load the CSV in chunks of this many rows")
+    parser.add_argument('--no-distill', action='store_true', help="skip distilling the forest in the dump stage")
+    parser.add_argument('--workdir', help="where synthetic CSVs and artifacts go (default: a temp dir)")
+    parser.add_argument('--keep', action='store_true', help="keep the synthetic CSVs and artifacts")
+    parser.add_argument('-o', '--output', default='training_benchmark.json', help="JSON results file")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='mindscope-train-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    results = {}
+    try:
+        for rows in args.sizes:
+            csv_path = os.path.join(workdir, f'synthetic_{rows}.csv')
+            print(f"\n{rows:,} rows: generating data...", file=sys.stderr)
+            start = time.perf_counter()
+            write_synthetic(csv_path, rows)
+            print(f"  generated {os.path.getsize(csv_path) / 1e6:.0f} MB in "
+                  f"{time.perf_counter() - start:.1f}s", file=sys.stderr)
+            results[str(rows)] = run_pipeline(csv_path, os.path.join(workdir, f'models_{rows}'),
+                                              args.search, args.chunksize, not args.no_distill)
+            # Write after every size so a long run that is interrupted keeps its results
+            with open(args.output, 'w') as f:
+                json.dump({'search': args.search, 'results': results}, f, indent=2)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'rows':>12}" + "".join(f"{s:>10}" for s in STAGES) + "   (seconds)")
+    for rows, report in results.items():
+        print(f"{int(rows):>12,}" + "".join(f"{report[s]['seconds']:>10.2f}" for s in STAGES))
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+MindScope-2025 — versioned model bundles with atomic publish and hot reload.
+
+A bundle is an immutable directory models/bundles/<version>/ holding every
+serving artifact (pickles, NumPy exports, encoders, feature order, optional
+lookup tables) plus a manifest.json with each file's SHA-256. The bundle's
+version is derived from those checksums. Publishing stages the copy under a
+temporary name, renames it into place and then flips models/CURRENT with
+os.replace, so a reader sees either the old bundle or the new one, never a
+half-written mix.
+
+Every bundle has the same layout as the flat models/ directory, so all
+existing loaders work on ``resolve_model_dir()`` unchanged. Without a CURRENT
+pointer the flat directory is served as before.
+
+Usage:
+    python bundle.py publish          # bundle the flat models/ artifacts
+    python bundle.py publish --overlay models/versions/<model>-<timestamp>
+    python bundle.py status
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+
+# Same default as inference.MODEL_DIR; this module stays import-free so the app
+# can start watching before pandas and scikit-learn are loaded
+MODEL_DIR = 'models'
+BUNDLES = 'bundles'
+POINTER = 'CURRENT'
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+# Flat-layout entries that are not serving artifacts
+SKIP = {BUNDLES, POINTER, 'versions'}
+
+
+# ==================== MANIFEST ====================
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _files(root):
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, root)
+            if rel != MANIFEST:
+                yield rel.replace(os.sep, '/')
+
+
+def build_manifest(root, **extra):
+    files = {rel: _sha256(os.path.join(root, rel)) for rel in sorted(_files(root))}
+    version = hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()[:12]
+    return {'format': FORMAT_VERSION, 'version': version,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'files': files, **extra}
+
+
+def verify(bundle_dir):
+    """Raise ValueError if any file in the bundle differs from its manifest."""
+    with open(os.path.join(bundle_dir, MANIFEST)) as f:
+        manifest = json.load(f)
+    for rel, digest in manifest['files'].items():
+        path = os.path.join(bundle_dir, rel)
+        if not os.path.exists(path) or _sha256(path) != digest:
+            raise ValueError(f"bundle {manifest['version']}: '{rel}' is missing or corrupt")
+    return manifest
+
+
+# ==================== PUBLISH ====================
+def _copy_artifacts(src_dir, dst_dir):
+    """Copy serving artifacts, replacing entries of the same name in ``dst_dir``."""
+    for entry in os.listdir(src_dir):
+        if entry in SKIP or entry == MANIFEST or entry.startswith('.'):
+            continue
+        src, dst = os.path.join(src_dir, entry), os.path.join(dst_dir, entry)
+        if os.path.isdir(dst):
+            shutil.rmtree(dst)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst)
+        else:
+            shutil.copy2(src, dst)
+
+
+def publish(model_dir=MODEL_DIR, keep=3, overlay=None, **extra):
+    """Copy the flat artifacts in ``model_dir`` into a new bundle and make it current.
+
+    With ``overlay`` the bundle starts from the one being served instead and
+    the artifacts in that directory replace their namesakes, e.g. a model
+    updated by 03_incremental_training.py and its extended encoders.
+    ``extra`` is stored in the manifest (e.g. training metrics). Returns the
+    bundle version; publishing identical artifacts again only re-points CURRENT.
+    """
+    bundles = os.path.join(model_dir, BUNDLES)
+    staging = os.path.join(bundles, f'.staging-{os.getpid()}')
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    if overlay is None:
+        _copy_artifacts(model_dir, staging)
+    else:
+        _copy_artifacts(resolve_model_dir(model_dir), staging)
+        _copy_artifacts(overlay, staging)
+
+    manifest = build_manifest(staging, **extra)
+    with open(os.path.join(staging, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    target = os.path.join(bundles, manifest['version'])
+    if os.path.exists(target):
+        shutil.rmtree(staging)
+    else:
+        os.rename(staging, target)
+
+    tmp = os.path.join(model_dir, f'.{POINTER}.tmp')
+    with open(tmp, 'w') as f:
+        f.write(manifest['version'])
+    os.replace(tmp, os.path.join(model_dir, POINTER))
+    prune(model_dir, keep)
+    return manifest['version']
+
+
+def prune(model_dir=MODEL_DIR, keep=3):
+    """Delete all but the newest ``keep`` bundles (never the current one).
+
+    Processes still holding a deleted bundle's memory-mapped arrays keep
+    reading them; the files only disappear from the directory.
+    """
+    bundles = os.path.join(model_dir, BUNDLES)
+    current = current_version(model_dir)
+    names = [n for n in os.listdir(bundles) if not n.startswith('.')]
+    names.sort(key=lambda n: os.path.getmtime(os.path.join(bundles, n)), reverse=True)
+    for name in names[keep:]:
+        if name != current:
+            shutil.rmtree(os.path.join(bundles, name), ignore_errors=True)
+
+
+# ==================== RESOLVE ====================
+def current_version(model_dir=MODEL_DIR):
+    """Version named by models/CURRENT, or None when no bundle has been published."""
+    try:
+        with open(os.path.join(model_dir, POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def resolve_model_dir(model_dir=MODEL_DIR):
+    """Directory to load artifacts from: the current bundle, else the flat ``model_dir``."""
+    version = current_version(model_dir)
+    return os.path.join(model_dir, BUNDLES, version) if version else model_dir
+
+
+# ==================== HOT RELOAD ====================
+class BundleWatcher:
+    """Holds the loaded artifacts and swaps in newly published bundles in the background.
+
+    ``load(directory)`` builds whatever the caller serves from (a tuple of
+    model, encoders, ...). The first load starts immediately on a daemon
+    thread; after it succeeds the same thread polls models/CURRENT every
+    ``interval`` seconds and, when it changes, loads the new bundle off the
+    request path, then replaces ``self.current`` in a single assignment.
+    Every bundle, the first one included, is checked against its manifest
+    before it is loaded. Callers take one snapshot per request via get(), so an
+    in-flight request finishes on the artifacts it started with. A bundle
+    that fails to load is reported and the previous one keeps serving.
+    ``release(old)``, if given, is called with each replaced snapshot so it
+    can stop threads or free resources the snapshot owns.
+    """
+
+    def __init__(self, load, model_dir=MODEL_DIR, interval=30.0, release=None):
+        self.load = load
+        self.release = release
+        self.model_dir = model_dir
+        self.interval = interval
+        self.current = None
+        self.version = None
+        self.error = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='bundle-watcher', daemon=True)
+        self._thread.start()
+
+    def get(self, timeout=None):
+        """The loaded artifacts, waiting for the first load; re-raises its failure."""
+        self._ready.wait(timeout)
+        if self.current is None:
+            raise self.error or TimeoutError("artifacts are still loading")
+        return self.current
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        self.version = seen = current_version(self.model_dir)
+        try:
+            directory = resolve_model_dir(self.model_dir)
+            if seen:
+                verify(directory)
+            self.current = self.load(directory)
+        except Exception as e:
+            self.error = e
+            return
+        finally:
+            self._ready.set()
+        while self.interval and not self._stop.wait(self.interval):
+            version = current_version(self.model_dir)
+            if version == seen:
+                continue
+            seen = version  # a broken bundle is reported once, not retried every poll
+            try:
+                directory = resolve_model_dir(self.model_dir)
+                if version:
+                    verify(directory)
+                old, self.current = self.current, self.load(directory)
+                self.version = version
+            except Exception as e:
+                print(f"Keeping bundle {self.version}: could not load {version}: {e}", file=sys.stderr)
+                continue
+            if self.release is not None:
+                self.release(old)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish or inspect versioned MindScope model bundles.")
+    parser.add_argument('command', choices=['publish', 'status'])
+    parser.add_argument('--models', default=MODEL_DIR, help="directory with the flat artifacts")
+    parser.add_argument('--keep', type=int, default=3, help="bundles to keep after publishing")
+    parser.add_argument('--overlay', help="publish the current bundle with this directory's artifacts swapped in")
+    args = parser.parse_args(argv)
+
+    if args.command == 'publish':
+        print(f"Published bundle {publish(args.models, args.keep, args.overlay)}")
+    version = current_version(args.models)
+    if version is None:
+        print(f"No bundle published; serving the flat artifacts in {args.models}")
+        return
+    manifest = verify(resolve_model_dir(args.models))
+    print(f"Current bundle {version} (created {manifest['created']}, {len(manifest['files'])} files, verified)")
+
+
+if __name__ == "__main__":
+    main()
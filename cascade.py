@@ -0,0 +1,190 @@
+"""
+MindScope-2025 — rule-first cascade over the PHQ-9 / GAD-7 score grid.
+
+The training labels come from clinical.get_risk_level, which looks only at
+the two questionnaire totals, so across most of the 28 x 22 score grid the
+model just reproduces the rule. At training time every (PHQ-9, GAD-7) cell
+is probed with the same sample of real answer rows, with only the two scores
+replaced. A cell is *decided* when the model picks the rule's label on at
+least ``threshold`` of the probes. Decided cells store the mean probabilities
+and are answered without calling the model; the rest, the ambiguous boundary
+cells, fall through to the estimator. The cost is that within a decided cell
+the rare answer pattern the model would have labelled differently (at most
+1 - threshold of the probes) gets the majority answer.
+
+For a multi-target model the cell also stores the majority Depression_Level
+and Anxiety_Level, which depend on the same two scores.
+
+The cascade is saved next to the model as <model>.cascade.npz and is tied to
+the artifact's version like the lookup table, so a retrained model never
+reads a stale one. Rebuilt from the command line, it is made for the served
+model and published with its bundle, like lookup_table.py.
+
+Usage (02_model_training.py builds one for the best model automatically):
+    python cascade.py --model random_forest_model --threshold 0.995
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from bundle import publish, resolve_model_dir
+from clinical import get_risk_level
+from inference import (DEFAULT_MODEL, MODEL_DIR, build_feature_matrix, load_artifacts, model_version,
+                       score_levels)
+from ingest import DATASET_PATH, read_dataset
+
+
+PHQ9_MAX = 27
+GAD7_MAX = 21
+DEFAULT_THRESHOLD = 0.99
+DEFAULT_PROBES = 1000
+
+
+def cascade_path(model_dir=MODEL_DIR, model_name=DEFAULT_MODEL):
+    return os.path.join(model_dir, f'{model_name}.cascade.npz')
+
+
+# ==================== BUILD ====================
+def build_cascade(model, feature_cols, X_sample, threshold=DEFAULT_THRESHOLD, probes=DEFAULT_PROBES,
+                  seed=42):
+    """Per-cell decided mask, mean risk probabilities and {target: majority level} grids."""
+    dep_col = feature_cols.index('Depression_Score')
+    anx_col = feature_cols.index('Anxiety_Score')
+    X_sample = np.asarray(X_sample, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    base = X_sample[rng.choice(len(X_sample), min(probes, len(X_sample)), replace=False)]
+
+    classes = np.asarray(model.classes_)
+    target_classes = dict(getattr(model, 'target_classes', None) or {})
+    primary = next(iter(target_classes), None)
+    target_classes.pop(primary, None)
+    shape = (PHQ9_MAX + 1, GAD7_MAX + 1)
+    decided = np.zeros(shape, dtype=bool)
+    proba = np.zeros(shape + (len(classes),), dtype=np.float32)
+    levels = {t: np.empty(shape, dtype=object) for t in target_classes}
+    for dep in range(shape[0]):
+        # One model call per PHQ-9 row: every GAD-7 score x every probe
+        X = np.tile(base, (shape[1], 1))
+        X[:, dep_col] = dep
+        X[:, anx_col] = np.repeat(np.arange(shape[1]), len(base))
+        outputs = model.predict_targets(X) if target_classes else {primary: model.predict_proba(X)}
+        p = outputs[primary].reshape(shape[1], len(base), len(classes))
+        rule = np.searchsorted(classes, get_risk_level(dep, np.arange(shape[1])))
+        decided[dep] = (p.argmax(axis=2) == rule[:, None]).mean(axis=1) >= threshold
+        proba[dep] = p.mean(axis=1)
+        for t, t_classes in target_classes.items():
+            mean = outputs[t].reshape(shape[1], len(base), len(t_classes)).mean(axis=1)
+            levels[t][dep] = np.asarray(t_classes)[mean.argmax(axis=1)]
+    return decided, proba, levels
+
+
+def write_cascade(model_dir=MODEL_DIR, model_name=DEFAULT_MODEL, X_sample=None, threshold=DEFAULT_THRESHOLD,
+                  probes=DEFAULT_PROBES, out_dir=None):
+    """Build the cascade for a saved model and store it beside the artifact (or in ``out_dir``); returns its path."""
+    model, encoders, feature_cols = load_artifacts(model_dir, 'auto', model_name)
+    if X_sample is None:
+        X_sample = build_feature_matrix(read_dataset(DATASET_PATH), encoders, feature_cols)
+    decided, proba, levels = build_cascade(model, list(feature_cols), X_sample, threshold, probes)
+    path = cascade_path(out_dir or model_dir, model_name)
+    tmp = f'{path}.tmp.npz'
+    np.savez(tmp, decided=decided, proba=proba, classes=np.asarray(model.classes_).astype(str),
+             threshold=threshold, version=model_version(model_dir, model_name),
+             **{f'level_{t}': grid.astype(str) for t, grid in levels.items()})
+    os.replace(tmp, path)
+    return path
+
+
+# ==================== SERVE ====================
+class RuleCascade:
+    """Answers decided score cells from stored probabilities; None sends a request to the model."""
+
+    def __init__(self, path, feature_cols):
+        with np.load(path) as data:
+            self.decided = data['decided']
+            self.proba = data['proba'].astype(np.float64)
+            self.classes_ = data['classes']
+            self.threshold = float(data['threshold'])
+            self.version = str(data['version'])
+            levels = {name[6:]: data[name] for name in data.files if name.startswith('level_')}
+        self.dep_col = list(feature_cols).index('Depression_Score')
+        self.anx_col = list(feature_cols).index('Anxiety_Score')
+        self.labels = self.classes_[self.proba.argmax(axis=2)]
+        self.levels = levels
+        # Nested lists make the scalar path two list indexings
+        self._decided = self.decided.tolist()
+        self._levels = [[{t: grid[d, a] for t, grid in levels.items()} for a in range(GAD7_MAX + 1)]
+                        for d in range(PHQ9_MAX + 1)]
+
+    def coverage(self):
+        """Fraction of the score grid answered without the model."""
+        return float(self.decided.mean())
+
+    def lookup(self, features):
+        """(label, probabilities, levels) for one encoded feature vector, or None if the model is needed."""
+        dep, anx = features[self.dep_col], features[self.anx_col]
+        if not (0 <= dep <= PHQ9_MAX and 0 <= anx <= GAD7_MAX) or dep % 1 or anx % 1:
+            return None
+        dep, anx = int(dep), int(anx)
+        if not self._decided[dep][anx]:
+            return None
+        return self.labels[dep, anx], self.proba[dep, anx], self._levels[dep][anx]
+
+    def score_levels(self, model, X):
+        """Batch form of score_levels: decided rows come from the cascade, only the rest hit the model."""
+        dep, anx = X[:, self.dep_col], X[:, self.anx_col]
+        ok = (dep >= 0) & (dep <= PHQ9_MAX) & (anx >= 0) & (anx <= GAD7_MAX) & (dep % 1 == 0) & (anx % 1 == 0)
+        d, a = np.where(ok, dep, 0).astype(np.intp), np.where(ok, anx, 0).astype(np.intp)
+        hit = ok & self.decided[d, a]
+        labels = self.labels[d, a].astype(object)
+        proba = self.proba[d, a]
+        levels = {t: grid[d, a].astype(object) for t, grid in self.levels.items()}
+        if not hit.all():
+            miss = ~hit
+            labels[miss], proba[miss], model_levels = score_levels(model, X[miss])
+            for t, values in model_levels.items():
+                levels[t][miss] = values
+        return labels, proba, levels
+
+
+def load_cascade(feature_cols, model_dir=MODEL_DIR, model_name=DEFAULT_MODEL):
+    """The model's cascade if one was built for the current artifact, else None."""
+    path = cascade_path(model_dir, model_name)
+    if not os.path.exists(path):
+        return None
+    cascade = RuleCascade(path, feature_cols)
+    return cascade if cascade.version == model_version(model_dir, model_name) else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the rule-first cascade for a saved model.")
+    parser.add_argument('--models', default=MODEL_DIR, help="directory with the saved artifacts")
+    parser.add_argument('--model', default=DEFAULT_MODEL, help="artifact to build it for (default %(default)s)")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="share of probes on which the model must agree with the rule (default %(default)s)")
+    parser.add_argument('--probes', type=int, default=DEFAULT_PROBES,
+                        help="answer rows each score cell is tested with (default %(default)s)")
+    parser.add_argument('--sample', default=DATASET_PATH, help="dataset-shaped CSV the probes are drawn from")
+    args = parser.parse_args(argv)
+
+    served = resolve_model_dir(args.models)
+    model, encoders, feature_cols = load_artifacts(served, 'auto', args.model)
+    X_sample = build_feature_matrix(read_dataset(args.sample, cache=False), encoders, feature_cols)
+    # Built aside, then published with the served bundle and kept in the flat directory for later publishes
+    with tempfile.TemporaryDirectory(prefix='.cascade-', dir=args.models) as staging:
+        path = write_cascade(served, args.model, X_sample, args.threshold, args.probes, out_dir=staging)
+        cascade = RuleCascade(path, feature_cols)
+        if served != args.models:
+            print(f"Published bundle {publish(args.models, overlay=staging)} with the cascade")
+        os.replace(path, cascade_path(args.models, args.model))
+
+    hits = cascade.decided[X_sample[:, cascade.dep_col].astype(int), X_sample[:, cascade.anx_col].astype(int)]
+    print(f"Cascade: {cascade.decided.sum()} of {cascade.decided.size} score cells decided "
+          f"at threshold {args.threshold}")
+    print(f"Sample coverage: {hits.mean():.1%} of {len(X_sample)} rows skip the model")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+MindScope-2025 — clinical banding for PHQ-9 / GAD-7 scores.
+
+Shared by 02_model_training.py (target derivation) and app.py (UI labels).
+Every function accepts a single score or a whole column and is vectorized
+with np.select, so deriving targets for millions of rows needs no Python
+per-row loop.
+"""
+
+import numpy as np
+
+
+# ==================== CLINICAL THRESHOLDS ====================
+PHQ9_THRESHOLDS = {'Minimal': (0, 4), 'Mild': (5, 9), 'Moderate': (10, 14), 'Moderately Severe': (15, 19), 'Severe': (20, 27)}
+GAD7_THRESHOLDS = {'Minimal': (0, 4), 'Mild': (5, 9), 'Moderate': (10, 14), 'Severe': (15, 21)}
+
+# Mean of PHQ-9 and GAD-7: below 5 is Low, below 12 Moderate, otherwise High
+RISK_CUTOFFS = {'Low': 5, 'Moderate': 12}
+
+
+def _result(levels):
+    """Unwrap 0-d results so scalar input gives back a plain str."""
+    return levels.item() if levels.ndim == 0 else levels
+
+
+def _band(score, thresholds):
+    score = np.asarray(score)
+    labels = list(thresholds)
+    conditions = [score <= thresholds[label][1] for label in labels[:-1]]
+    return _result(np.select(conditions, labels[:-1], default=labels[-1]))
+
+
+# ==================== BANDING ====================
+def get_depression_level(score):
+    """PHQ-9 severity band for one score or an array of scores."""
+    return _band(score, PHQ9_THRESHOLDS)
+
+
+def get_anxiety_level(score):
+    """GAD-7 severity band for one score or an array of scores."""
+    return _band(score, GAD7_THRESHOLDS)
+
+
+def get_risk_level(dep_score, anx_score):
+    """Combined Low / Moderate / High risk from PHQ-9 and GAD-7 scores."""
+    risk = (np.asarray(dep_score) + np.asarray(anx_score)) / 2
+    conditions = [risk < cutoff for cutoff in RISK_CUTOFFS.values()]
+    return _result(np.select(conditions, list(RISK_CUTOFFS), default='High'))
@@ -0,0 +1,206 @@
+"""
+MindScope-2025 — NumPy-only model format and predictor.
+
+02_model_training.py exports the selected estimator here as a compact .npz
+(logistic coefficients or flattened tree node arrays) together with the
+encoder classes and feature order. CompiledModel reproduces the sklearn
+labels and probabilities with plain NumPy, so serving never has to import
+scikit-learn or unpickle estimators.
+
+Forests can also be exported to a directory of uncompressed .npy files, which
+load with ``mmap_mode='r'`` so every worker process on a host shares one
+page-cached copy of the node arrays.
+
+Trees fitted on several targets at once (a 2-D y) keep one set of node arrays
+and store every target's leaf distributions side by side. The first target is
+the primary one: ``classes_`` and ``predict_proba`` refer to it, so the model
+drops into single-target code unchanged, while ``predict_targets`` returns
+every target from the same traversal.
+"""
+
+import os
+import shutil
+
+import numpy as np
+
+
+FORMAT_VERSION = 1
+
+
+# ==================== EXPORT ====================
+def _pack_trees(trees):
+    """Concatenate fitted sklearn trees into flat node arrays with global child ids."""
+    left, right, feature, threshold, proba, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        t = tree.tree_
+        is_leaf = t.children_left < 0
+        left.append(np.where(is_leaf, -1, t.children_left + offset))
+        right.append(np.where(is_leaf, -1, t.children_right + offset))
+        feature.append(np.where(is_leaf, 0, t.feature))
+        threshold.append(t.threshold)
+        # One block of columns per target, each normalized to a distribution
+        blocks = [t.value[:, o, :n] for o, n in enumerate(np.atleast_1d(t.n_classes))]
+        proba.append(np.hstack([v / v.sum(axis=1, keepdims=True) for v in blocks]))
+        roots.append(offset)
+        offset += t.node_count
+    return {
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'proba': np.concatenate(proba).astype(np.float64),
+        'roots': np.asarray(roots, dtype=np.int32),
+    }
+
+
+def model_arrays(model):
+    """Extract the arrays needed to evaluate a fitted sklearn classifier."""
+    if hasattr(model, 'coef_'):
+        return 'logistic', {
+            'coef': np.asarray(model.coef_, dtype=np.float64),
+            'intercept': np.asarray(model.intercept_, dtype=np.float64),
+            'ovr': np.asarray(getattr(model, 'multi_class', 'auto') == 'ovr'),
+        }
+    if hasattr(model, 'estimators_'):
+        return 'forest', _pack_trees(model.estimators_)
+    if hasattr(model, 'tree_'):
+        return 'forest', _pack_trees([model])
+    raise TypeError(f"cannot compile {type(model).__name__}")
+
+
+def _save_dir(path, arrays):
+    """Write one uncompressed .npy per array, replacing any previous export.
+
+    Files are written to a fresh directory and swapped in, never overwritten
+    in place: truncating a file that another process has memory-mapped would
+    crash that reader. The previous export is renamed aside before the new
+    one is renamed in and only deleted afterwards, so ``path`` is missing for
+    two renames rather than for a whole recursive delete.
+    """
+    tmp, old = f'{path}.tmp', f'{path}.old'
+    for stale in (tmp, old):
+        shutil.rmtree(stale, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, f'{name}.npy'), array)
+    if os.path.isdir(path):
+        os.rename(path, old)
+    os.rename(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def export_model(model, encoders, feature_cols, path, targets=None):
+    """Write a fitted model, its encoders' classes and the feature order.
+
+    A path ending in .npz gives one compressed file; any other path gives a
+    directory of uncompressed .npy arrays that can be memory-mapped.
+    ``targets`` names the columns of a multi-target model's y, in order.
+    """
+    kind, arrays = model_arrays(model)
+    classes = model.classes_
+    if isinstance(classes, list):
+        arrays['targets'] = np.asarray(targets, dtype=str)
+        for i, target_classes in enumerate(classes):
+            arrays[f'target_classes_{i}'] = np.asarray(target_classes).astype(str)
+        classes = classes[0]
+    arrays = {
+        'format_version': np.asarray(FORMAT_VERSION),
+        'kind': np.asarray(kind),
+        'classes': np.asarray(classes).astype(str),
+        'feature_cols': np.asarray(feature_cols, dtype=str),
+        **arrays,
+        **{f'enc_{key}': np.asarray(enc.classes_).astype(str) for key, enc in encoders.items()},
+    }
+    if path.endswith('.npz'):
+        np.savez_compressed(path, **arrays)
+    else:
+        _save_dir(path, arrays)
+
+
+# ==================== PREDICTOR ====================
+class CompiledModel:
+    """Pure-NumPy stand-in for the exported estimator (predict / predict_proba)."""
+
+    def __init__(self, kind, classes, arrays, feature_cols=None, encoder_classes=None, target_classes=None):
+        self.kind = kind
+        self.classes_ = np.asarray(classes)
+        self.arrays = arrays
+        self.feature_cols = feature_cols
+        self.encoder_classes = encoder_classes or {}
+        # {target: classes} for multi-target forests, first entry = primary target
+        self.target_classes = target_classes
+        if target_classes:
+            bounds = np.cumsum([0] + [len(c) for c in target_classes.values()])
+            self._slices = {t: slice(a, b) for t, a, b in zip(target_classes, bounds[:-1], bounds[1:])}
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """Load a .npz file or an .npy directory (memory-mapped when ``mmap_mode`` is set)."""
+        if os.path.isdir(path):
+            files = {name[:-4]: np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+                     for name in os.listdir(path) if name.endswith('.npy')}
+        else:
+            with np.load(path, allow_pickle=False) as data:
+                files = {name: data[name] for name in data.files}
+        if int(files.pop('format_version')) != FORMAT_VERSION:
+            raise ValueError(f"unsupported compiled model format in {path}")
+        kind = str(files.pop('kind'))
+        classes = files.pop('classes')
+        feature_cols = files.pop('feature_cols').tolist()
+        encoder_classes = {name[4:]: files.pop(name) for name in list(files) if name.startswith('enc_')}
+        target_classes = None
+        if 'targets' in files:
+            targets = files.pop('targets').tolist()
+            target_classes = {t: files.pop(f'target_classes_{i}') for i, t in enumerate(targets)}
+        return cls(kind, classes, files, feature_cols, encoder_classes, target_classes)
+
+    def _proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if self.kind == 'logistic':
+            return self._logistic_proba(X)
+        return self._forest_proba(X)
+
+    def predict_proba(self, X):
+        p = self._proba(X)
+        return p[:, :len(self.classes_)] if self.target_classes else p
+
+    def predict_targets(self, X):
+        """{target: probabilities} for every target from one evaluation (multi-target forests)."""
+        p = self._proba(X)
+        if not self.target_classes:
+            raise TypeError("model was fitted on a single target")
+        return {t: p[:, s] for t, s in self._slices.items()}
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def _logistic_proba(self, X):
+        a = self.arrays
+        scores = X @ a['coef'].T + a['intercept']
+        if scores.shape[1] == 1:
+            p = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - p, p])
+        if a['ovr']:
+            p = 1.0 / (1.0 + np.exp(-scores))
+            return p / p.sum(axis=1, keepdims=True)
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def _forest_proba(self, X):
+        a = self.arrays
+        # sklearn trees split on float32 inputs; compare the same way
+        X = X.astype(np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(a['roots'], (len(X), len(a['roots']))).copy()
+        while True:
+            left = a['left'][node]
+            active = left >= 0
+            if not active.any():
+                break
+            go_left = X[rows, a['feature'][node]] <= a['threshold'][node]
+            node = np.where(active, np.where(go_left, left, a['right'][node]), node)
+        return a['proba'][node].mean(axis=1)
@@ -0,0 +1,3 @@
+# Lets plain `pytest` from the repository root import the top-level modules
+# (inference, bundle, ...) the way the scripts do; pytest puts this file's
+# directory on sys.path. Tests read models/ and Data/ relative to the root.
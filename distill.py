@@ -0,0 +1,199 @@
+"""
+MindScope-2025 — distil the random forest into a small model under an accuracy budget.
+
+The forest (100 trees, depth 15, ~4 MB) is fitted on only 12 features whose
+values the app draws from small, known domains. Its decision surface can be
+learnt again by a much smaller model. This module labels dense synthetic
+samples with the forest: real rows plus rows drawn uniformly from every
+feature's input domain (lookup_table.feature_domain). It then tries ever
+larger students, smallest first:
+
+  * single trees fitted on the forest's labels, depth 1, 2, ... max_depth;
+  * the forest's first 1, 2, 4, ... trees, if no single tree is good enough.
+
+The first student whose risk accuracy on labelled reference rows is within
+``max_loss`` of the forest's own is saved as <forest>_distilled (a pickle
+plus a compressed NumPy export). It loads like any other artifact, e.g.
+``serve.py --model random_forest_model_distilled``. A multi-target forest
+gives a multi-target student.
+
+Usage (02_model_training.py distils the forest automatically):
+    python distill.py --max-loss 0.01
+    python distill.py --max-loss 0.005 --sample holdout.csv
+"""
+
+import argparse
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+
+from clinical import get_risk_level
+from compiled_model import export_model
+from inference import (MODEL_DIR, TARGETS, MultiTargetModel, build_feature_matrix, compiled_path,
+                       load_artifacts)
+from ingest import DATASET_PATH, read_dataset
+from lookup_table import feature_domain
+from timing import bench_load, engines, measure
+
+
+FOREST = 'random_forest_model'
+DEFAULT_MAX_LOSS = 0.01
+DEFAULT_SAMPLES = 200_000
+DEFAULT_MAX_DEPTH = 12
+
+
+def distilled_name(model_name=FOREST):
+    return f'{model_name}_distilled'
+
+
+def risk_predictions(model, X):
+    """Risk_Level predictions from a single- or multi-target estimator."""
+    pred = np.asarray(model.predict(X))
+    return pred[:, 0] if pred.ndim == 2 else pred
+
+
+# ==================== DISTIL ====================
+def synthetic_samples(X_sample, encoders, feature_cols, n=DEFAULT_SAMPLES, seed=42):
+    """The real rows followed by ``n`` rows drawn uniformly from each feature's domain."""
+    rng = np.random.default_rng(seed)
+    dense = np.column_stack([rng.choice(feature_domain(col, encoders), n) for col in feature_cols])
+    X = np.vstack([np.asarray(X_sample, dtype=np.float64), dense])
+    return pd.DataFrame(X, columns=list(feature_cols))
+
+
+def students(forest, X, y, max_depth=DEFAULT_MAX_DEPTH):
+    """(description, fitted model) candidates in increasing size."""
+    from sklearn.tree import DecisionTreeClassifier
+    for depth in range(1, max_depth + 1):
+        yield f'tree of depth {depth}', DecisionTreeClassifier(max_depth=depth, random_state=42).fit(X, y)
+    n_trees = len(forest.estimators_)
+    k = 1
+    while k < n_trees:
+        subset = copy.copy(forest)
+        subset.estimators_ = forest.estimators_[:k]
+        subset.n_estimators = k
+        yield f'first {k} of {n_trees} trees', subset
+        k *= 2
+
+
+def distill(forest, X_synthetic, X_ref, y_ref, max_loss=DEFAULT_MAX_LOSS, max_depth=DEFAULT_MAX_DEPTH):
+    """Smallest student whose risk accuracy on (X_ref, y_ref) is at most ``max_loss`` below the forest's.
+
+    Returns (description, student, student accuracy, forest accuracy); the
+    student is None when no candidate meets the budget.
+    """
+    forest_acc = float((risk_predictions(forest, X_ref) == np.asarray(y_ref)).mean())
+    teacher = forest.predict(X_synthetic)
+    for name, student in students(forest, X_synthetic, teacher, max_depth):
+        acc = float((risk_predictions(student, X_ref) == np.asarray(y_ref)).mean())
+        print(f"  {name:<24} accuracy {acc:.4f} (loss {forest_acc - acc:+.4f})")
+        if forest_acc - acc <= max_loss:
+            return name, student, acc, forest_acc
+    return None, None, None, forest_acc
+
+
+def write_distilled(model_dir=MODEL_DIR, model_name=FOREST, X_sample=None, X_ref=None, y_ref=None,
+                    max_loss=DEFAULT_MAX_LOSS, samples=DEFAULT_SAMPLES, max_depth=DEFAULT_MAX_DEPTH):
+    """Distil a saved forest and store the student beside it; returns its artifact name or None.
+
+    ``X_sample`` seeds the synthetic set (default: the dataset, at most
+    ``samples`` rows of it); ``X_ref`` / ``y_ref`` are the labelled rows the
+    accuracy loss is measured on (default: those rows labelled by
+    clinical.get_risk_level).
+    """
+    import joblib
+    forest, encoders, feature_cols = load_artifacts(model_dir, 'sklearn', model_name)
+    if isinstance(forest, MultiTargetModel):
+        forest = forest.estimator
+    if X_sample is None:
+        X_sample = build_feature_matrix(read_dataset(DATASET_PATH), encoders, feature_cols)
+    X_sample = np.asarray(X_sample, dtype=np.float64)
+    if len(X_sample) > samples:
+        # Bounded cost on very large training sets
+        X_sample = X_sample[np.random.default_rng(42).choice(len(X_sample), samples, replace=False)]
+    if X_ref is None:
+        X_ref = X_sample
+        cols = list(feature_cols)
+        y_ref = get_risk_level(X_ref[:, cols.index('Depression_Score')], X_ref[:, cols.index('Anxiety_Score')])
+    X_ref = pd.DataFrame(np.asarray(X_ref, dtype=np.float64), columns=list(feature_cols))
+
+    print(f"Distilling {model_name} on {len(X_sample) + samples} synthetic rows "
+          f"(budget: {max_loss:.2%} accuracy loss)...")
+    X_synthetic = synthetic_samples(X_sample, encoders, feature_cols, samples)
+    name, student, acc, forest_acc = distill(forest, X_synthetic, X_ref, y_ref, max_loss, max_depth)
+    if student is None:
+        print(f"  No student within {max_loss:.2%} of the forest's {forest_acc:.4f}; nothing saved")
+        return None
+
+    out = distilled_name(model_name)
+    joblib.dump(student, os.path.join(model_dir, f'{out}.pkl'))
+    export_model(student, encoders, feature_cols, os.path.join(model_dir, f'{out}.npz'), targets=TARGETS)
+    print(f"  Kept the {name}: accuracy {acc:.4f} vs {forest_acc:.4f} -> {out}")
+    return out
+
+
+# ==================== REPORT ====================
+def artifact_size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return os.path.getsize(path) if os.path.exists(path) else None
+
+
+def compare(model_dir=MODEL_DIR, model_names=(FOREST, distilled_name()), X=None):
+    """Artifact size, load time and single-row latency per model and engine.
+
+    Latency is measured on rows of ``X`` (default: the encoded dataset).
+    """
+    X = None if X is None else np.asarray(X, dtype=np.float64)
+    rows = []
+    for model_name in model_names:
+        for engine in engines(model_dir, model_name):
+            model, encoders, feature_cols = load_artifacts(model_dir, engine, model_name)
+            if X is None:
+                X = build_feature_matrix(read_dataset(DATASET_PATH), encoders, feature_cols)
+            path = (compiled_path(model_dir, model_name) if engine == 'numpy'
+                    else os.path.join(model_dir, f'{model_name}.pkl'))
+            i = iter(range(10 ** 12))
+            rows.append({
+                'model': model_name,
+                'engine': engine,
+                'size_kb': artifact_size(path) / 1e3,
+                'load_ms': bench_load(model_dir, model_name, engine)['median_us'] / 1e3,
+                'single_row_us': measure(lambda: model.predict_proba(X[[next(i) % len(X)]]))['median_us'],
+            })
+    return rows
+
+
+def print_comparison(rows):
+    print(f"\n{'model':<32}{'engine':<9}{'size':>11}{'load':>11}{'1 row':>11}")
+    for r in rows:
+        print(f"{r['model']:<32}{r['engine']:<9}{r['size_kb']:>8.0f} KB{r['load_ms']:>8.1f} ms"
+              f"{r['single_row_us']:>8.0f} us")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distil the random forest into a smaller model.")
+    parser.add_argument('--models', default=MODEL_DIR, help="directory with the saved artifacts")
+    parser.add_argument('--model', default=FOREST, help="forest to distil (default %(default)s)")
+    parser.add_argument('--max-loss', type=float, default=DEFAULT_MAX_LOSS,
+                        help="largest accepted drop in risk accuracy, e.g. 0.01 = 1 point (default %(default)s)")
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES,
+                        help="synthetic rows drawn from the feature domains (default %(default)s)")
+    parser.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH,
+                        help="deepest single tree tried before tree subsets (default %(default)s)")
+    parser.add_argument('--sample', default=DATASET_PATH,
+                        help="dataset-shaped CSV for the real rows and the accuracy check")
+    args = parser.parse_args(argv)
+
+    _, encoders, feature_cols = load_artifacts(args.models, 'sklearn', args.model)
+    X_sample = build_feature_matrix(read_dataset(args.sample, cache=False), encoders, feature_cols)
+    out = write_distilled(args.models, args.model, X_sample, max_loss=args.max_loss, samples=args.samples,
+                          max_depth=args.max_depth)
+    if out is not None:
+        print_comparison(compare(args.models, (args.model, out)))
+
+
+if __name__ == "__main__":
+    main()
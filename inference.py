@@ -0,0 +1,626 @@
+"""
+MindScope-2025 — model inference shared by the Streamlit app and batch scoring.
+
+Kept free of Streamlit so the same encoding and scoring logic can run from
+CLIs and services.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from compiled_model import CompiledModel
+from metrics import BATCH_SIZE_METRIC, STAGE_METRIC, inc, observe, span
+
+
+MODEL_DIR = 'models'
+# Artifact stem to serve: best_risk_model, or e.g. random_forest_model
+DEFAULT_MODEL = os.environ.get('MINDSCOPE_MODEL', 'best_risk_model')
+
+# Encoded feature column -> (raw dataset column, key in encoders.pkl)
+ENCODED_COLUMNS = {
+    'Gender_Encoded': ('Gender', 'gender'),
+    'Stress_Level_Encoded': ('Stress_Level', 'stress'),
+    'Physical_Activity_Encoded': ('Physical_Activity', 'activity'),
+    'Chronic_Illness_Encoded': ('Chronic_Illness', 'illness'),
+    'Mental_Health_History_Encoded': ('Mental_Health_History', 'history'),
+    'Treatment_Encoded': ('Treatment', 'treatment'),
+    'Work_Status_Encoded': ('Work_Status', 'work'),
+}
+
+# Targets a multi-target model is fitted on, in column order of its 2-D y; the
+# first is the primary one that classes_ / predict_proba refer to
+TARGETS = ('Risk_Level', 'Depression_Level', 'Anxiety_Level')
+
+# Label used for a blank value; training reads a blank treatment as 'None' (no treatment)
+MISSING_LABELS = {'Treatment': 'None'}
+# Values 02_model_training.py put into blank cells (e.g. median Sleep_Hours,
+# modal Physical_Activity), saved beside the encoders so serving fills the same way
+FILL_VALUES = 'fill_values.json'
+
+
+# ==================== ENCODING ====================
+class LookupEncoder:
+    """Precompiled label -> code table built once from a fitted LabelEncoder.
+
+    The saved encoders were trained on a subset of the UI options (e.g. gender
+    only saw Male/Female). Labels outside ``classes_`` — including missing
+    values — fall back to the first class instead of raising, so the inclusive
+    dropdowns never crash prediction.
+    """
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+        self.index = {label: code for code, label in enumerate(self.classes_.tolist())}
+
+    @classmethod
+    def from_label_encoder(cls, encoder):
+        return cls(encoder.classes_)
+
+    def encode(self, value):
+        """Encode a single label."""
+        return self.index.get(value, 0)
+
+    def transform(self, values, missing=None):
+        """Encode one label (-> int) or a whole column (-> int array).
+
+        Missing values in a column are encoded as the ``missing`` label when
+        given, otherwise they take the unseen-label fallback.
+        """
+        if isinstance(values, str) or np.ndim(values) == 0:
+            return self.encode(values)
+        # Look up each distinct label once, then broadcast through the codes.
+        # Missing values carry code -1, which picks the trailing entry.
+        if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        table = np.fromiter((self.index.get(u, 0) for u in uniques), dtype=np.int64,
+                            count=len(uniques))
+        fill = 0 if missing is None else self.encode(missing)
+        return np.append(table, fill)[codes]
+
+
+class EncoderSet(dict):
+    """{key: LookupEncoder} plus the {raw column: value} used for blank cells.
+
+    Also holds the FeatureAssemblers planned from it, one per feature order
+    (see feature_assembler).
+    """
+
+    def __init__(self, encoders, fill_values=None):
+        super().__init__(encoders)
+        self.fill_values = dict(MISSING_LABELS) if fill_values is None else fill_values
+        self.assemblers = {}
+
+
+def compile_encoders(encoders, fill_values=None):
+    """Turn the saved {key: LabelEncoder} dict into an EncoderSet of LookupEncoders."""
+    return EncoderSet({key: LookupEncoder.from_label_encoder(enc) for key, enc in encoders.items()},
+                      fill_values)
+
+
+def load_fill_values(model_dir=MODEL_DIR):
+    """Training's fill values for blank cells; artifacts saved before they were recorded get MISSING_LABELS."""
+    try:
+        with open(os.path.join(model_dir, FILL_VALUES)) as f:
+            return {**MISSING_LABELS, **json.load(f)}
+    except FileNotFoundError:
+        return dict(MISSING_LABELS)
+
+
+def save_fill_values(fill_values, model_dir=MODEL_DIR):
+    with open(os.path.join(model_dir, FILL_VALUES), 'w') as f:
+        json.dump(fill_values, f, indent=2)
+
+
+# ==================== ARTIFACTS ====================
+def compiled_path(model_dir=MODEL_DIR, model_name=DEFAULT_MODEL):
+    """Path of a model's NumPy export: the .npy directory if present, else the .npz."""
+    for path in (os.path.join(model_dir, model_name), os.path.join(model_dir, f'{model_name}.npz')):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_artifacts(model_dir=MODEL_DIR, engine='auto', model_name=DEFAULT_MODEL):
+    """Load the risk model, the compiled encoders (with their fill values) and the feature column order.
+
+    ``engine='numpy'`` serves the NumPy-only export (no scikit-learn import),
+    ``'sklearn'`` unpickles the estimator and ``'auto'`` prefers the export
+    when it exists. Exported .npy directories are memory-mapped read-only, so
+    worker processes share one page-cached copy of the forest's node arrays.
+    """
+    path = compiled_path(model_dir, model_name)
+    if engine == 'numpy' or (engine == 'auto' and path):
+        if path is None:
+            raise FileNotFoundError(f"no NumPy export of '{model_name}' in {model_dir}")
+        model = CompiledModel.load(path, mmap_mode='r')
+        encoders = EncoderSet({key: LookupEncoder(classes) for key, classes in model.encoder_classes.items()},
+                              load_fill_values(model_dir))
+        return model, encoders, model.feature_cols
+    import joblib  # only the pickled path needs joblib (and scikit-learn)
+    model = joblib.load(f'{model_dir}/{model_name}.pkl')
+    if isinstance(model.classes_, list):
+        model = MultiTargetModel(model)
+    encoders = compile_encoders(joblib.load(f'{model_dir}/encoders.pkl'), load_fill_values(model_dir))
+    feature_cols = joblib.load(f'{model_dir}/feature_cols.pkl')
+    return model, encoders, feature_cols
+
+
+class MultiTargetModel:
+    """Primary-target view of a scikit-learn estimator fitted on TARGETS (a 2-D y).
+
+    Same interface as a multi-target CompiledModel: ``classes_`` and
+    ``predict_proba`` refer to Risk_Level, and ``predict_targets`` returns
+    every target from one predict_proba call.
+    """
+
+    def __init__(self, estimator, targets=TARGETS):
+        self.estimator = estimator
+        self.classes_ = estimator.classes_[0]
+        self.target_classes = dict(zip(targets, estimator.classes_))
+
+    def predict_targets(self, X):
+        return dict(zip(self.target_classes, self.estimator.predict_proba(X)))
+
+    def predict_proba(self, X):
+        return self.estimator.predict_proba(X)[0]
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def model_version(model_dir=MODEL_DIR, model_name=DEFAULT_MODEL):
+    """Short content hash of a model's artifact, used to key caches."""
+    digest = hashlib.sha256()
+    for name in (f'{model_name}.pkl', f'{model_name}.npz', model_name):
+        path = os.path.join(model_dir, name)
+        if os.path.isfile(path):
+            files = [path]
+        elif os.path.isdir(path):
+            files = sorted(os.path.join(path, f) for f in os.listdir(path))
+        else:
+            continue
+        for file in files:
+            with open(file, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()[:12]
+    raise FileNotFoundError(f"no artifact for '{model_name}' in {model_dir}")
+
+
+# ==================== FEATURES ====================
+class FeatureAssembler:
+    """Encodes raw records into model input rows, in the order of feature_cols.
+
+    The column plan (position, source column, encoder, fill value) is
+    compiled once from the saved feature_cols, so adding a feature at
+    training time can never reorder the serving input. Blank cells (None or
+    NaN) get the value training filled them with, taken from
+    ``encoders.fill_values`` when the encoders came from load_artifacts.
+    Batches are written into the rows of a caller-supplied matrix, so the
+    request path allocates no fresh arrays; get one through
+    feature_assembler() to plan each (encoders, feature_cols) only once.
+    """
+
+    def __init__(self, encoders, feature_cols, dtype=np.float64):
+        self.feature_cols = list(feature_cols)
+        self.dtype = dtype
+        fill_values = getattr(encoders, 'fill_values', MISSING_LABELS)
+        self.plan = []
+        for col in self.feature_cols:
+            source, key = ENCODED_COLUMNS.get(col, (col, None))
+            encoder = encoders[key] if key is not None else None
+            self.plan.append((source, encoder, fill_values.get(source)))
+
+    def __len__(self):
+        return len(self.plan)
+
+    def encode(self, record):
+        """Encoded feature tuple for one raw record (dict keyed by dataset column).
+
+        Raises ValueError naming the first missing or non-numeric field.
+        """
+        values = []
+        for source, encoder, missing in self.plan:
+            if source not in record:
+                raise ValueError(f"missing field '{source}'")
+            value = record[source]
+            if missing is not None and (value is None or value != value):  # NaN != NaN
+                value = missing
+            if encoder is not None:
+                values.append(encoder.encode(value))
+            else:
+                try:
+                    values.append(float(value))
+                except (TypeError, ValueError):
+                    raise ValueError(f"field '{source}' must be numeric") from None
+        return tuple(values)
+
+    def fill(self, rows, out):
+        """Write encoded feature tuples into the leading rows of ``out``; returns that view."""
+        X = out[:len(rows)]
+        for i, features in enumerate(rows):
+            X[i] = features
+        return X
+
+    def transform(self, frame):
+        """Model input matrix for a frame with the dataset's raw columns (vectorized per column)."""
+        X = np.empty((len(frame), len(self.plan)), dtype=self.dtype)
+        for j, (source, encoder, missing) in enumerate(self.plan):
+            if encoder is not None:
+                X[:, j] = encoder.transform(frame[source], missing)
+            else:
+                X[:, j] = frame[source].to_numpy(dtype=self.dtype, na_value=np.nan)
+                if missing is not None:
+                    X[np.isnan(X[:, j]), j] = missing
+        return X
+
+
+def feature_assembler(encoders, feature_cols):
+    """The FeatureAssembler for these encoders and feature order, planned once per EncoderSet.
+
+    Plain encoder dicts (e.g. the LabelEncoders from training) get a fresh one.
+    """
+    if not isinstance(encoders, EncoderSet):
+        return FeatureAssembler(encoders, feature_cols)
+    key = tuple(feature_cols)
+    assembler = encoders.assemblers.get(key)
+    if assembler is None:
+        assembler = encoders.assemblers[key] = FeatureAssembler(encoders, key)
+    return assembler
+
+
+def build_feature_matrix(frame, encoders, feature_cols):
+    """Build the model input matrix for a frame with the dataset's raw columns."""
+    return feature_assembler(encoders, feature_cols).transform(frame)
+
+
+def encode_record(record, encoders, feature_cols):
+    """Encode one raw record (dict keyed by dataset column) into a feature tuple.
+
+    Raises ValueError naming the first missing or non-numeric field.
+    """
+    return feature_assembler(encoders, feature_cols).encode(record)
+
+
+# ==================== SCORING ====================
+def score_matrix(model, X):
+    """Labels and probabilities for an encoded feature matrix from one predict_proba call."""
+    proba = model.predict_proba(X)
+    return model.classes_[proba.argmax(axis=1)], proba
+
+
+def score_levels(model, X):
+    """Risk labels, risk probabilities and {target: labels} for the other TARGETS.
+
+    A multi-target model answers all three from one evaluation; for a model
+    fitted on Risk_Level alone the dict is empty.
+    """
+    if getattr(model, 'target_classes', None) is None:
+        labels, proba = score_matrix(model, X)
+        return labels, proba, {}
+    outputs = model.predict_targets(X)
+    levels = {t: model.target_classes[t][p.argmax(axis=1)] for t, p in outputs.items()}
+    primary = next(iter(outputs))
+    return levels.pop(primary), outputs[primary], levels
+
+
+def score_frame(frame, model, encoders, feature_cols, cascade=None):
+    """Score every row of a frame with one predict_proba call.
+
+    Returns a frame with the predicted Risk_Level, the predicted
+    Depression_Level and Anxiety_Level for multi-target models, and one
+    probability column per risk class, aligned to the input index. With a
+    RuleCascade only the rows in undecided score cells reach the model.
+    Rows with a blank that has no fill value (e.g. Age, PHQ-9) are left
+    unscored: empty labels and NaN probabilities.
+    """
+    X = build_feature_matrix(frame, encoders, feature_cols)
+    score = cascade.score_levels if cascade is not None else score_levels
+    complete = ~np.isnan(X).any(axis=1)
+    if complete.all():
+        labels, proba, levels = score(model, X)
+    else:
+        labels = np.full(len(X), None, dtype=object)
+        proba = np.full((len(X), len(model.classes_)), np.nan)
+        levels = {}
+        if complete.any():
+            labels[complete], proba[complete], scored_levels = score(model, X[complete])
+            for target, values in scored_levels.items():
+                levels[target] = np.full(len(X), None, dtype=object)
+                levels[target][complete] = values
+    scored = pd.DataFrame(
+        proba, index=frame.index,
+        columns=[f'Prob_{c}' for c in model.classes_],
+    )
+    for i, (target, values) in enumerate({'Risk_Level': labels, **levels}.items()):
+        scored.insert(i, target, values)
+    return scored
+
+
+# ==================== CACHING ====================
+class PredictionCache:
+    """Bounded, thread-safe LRU of predictions keyed on (model version, encoded features).
+
+    The model only sees a coarse, finite input space, so identical answer
+    vectors are common; repeats skip encoding-to-model work entirely. Keying on
+    the model version means a retrained model never serves stale entries.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, features):
+        key = (version, features)
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, version, features, value):
+        key = (version, features)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+
+# ==================== PROCESS POOL ====================
+# Each worker process keeps the models it scored with most recently. Two slots
+# let batches for the outgoing and the newly published bundle interleave during
+# a swap without reloading on every switch; a third bundle evicts the oldest.
+WORKER_MODELS = 2
+_worker_models = OrderedDict()
+
+
+def _worker_model(model_dir, engine, model_name):
+    key = (model_dir, engine, model_name)
+    model = _worker_models.get(key)
+    if model is None:
+        model = _worker_models[key] = load_artifacts(model_dir, engine, model_name)[0]
+        while len(_worker_models) > WORKER_MODELS:
+            _worker_models.popitem(last=False)
+    else:
+        _worker_models.move_to_end(key)
+    return model
+
+
+def _score_in_worker(key, X):
+    return score_levels(_worker_model(*key), X)
+
+
+class InferencePool:
+    """Process pool that scores encoded feature matrices outside the caller's GIL.
+
+    Every worker loads the model once at startup (the forest export is
+    memory-mapped, so workers share its pages) and then scores whole batches,
+    so concurrent callers in one process no longer contend for the
+    interpreter while predict_proba runs. Workers are spawned rather than
+    forked, which is safe from a threaded server such as Streamlit.
+    """
+
+    def __init__(self, workers=2, model_dir=MODEL_DIR, engine='auto', model_name=DEFAULT_MODEL):
+        self.workers = workers
+        self.engine = engine
+        self.model_name = model_name
+        self._executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_worker_model,
+                                             initargs=(model_dir, engine, model_name))
+
+    def warm_up(self):
+        """Start every worker now (loading the model) instead of on the first batches."""
+        for _ in range(self.workers):
+            self._executor.submit(os.getpid)
+
+    def submit(self, X, model_dir=MODEL_DIR):
+        """Future of (labels, probabilities) for the rows of ``X``."""
+        return self._executor.submit(_score_in_worker, (model_dir, self.engine, self.model_name), X)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait)
+
+
+# ==================== MICRO-BATCHING ====================
+class MicroBatcher:
+    """Coalesce concurrent single-record requests into batched predict_proba calls.
+
+    Callers submit raw records (dicts keyed by dataset column) from any thread
+    and get a Future back. A worker thread collects whatever arrives within
+    ``max_wait`` seconds of the first pending record (up to ``max_batch``) and
+    runs the window through a single model call. Vectors found in the
+    rule cascade, the PredictionCache or the precomputed RiskTable are answered
+    at submit time without queueing.
+
+    With an InferencePool the window is handed to a worker process instead,
+    and the batcher goes straight back to collecting the next window, so
+    several batches can be scored at once. ``model_dir`` tells the workers
+    which artifacts (e.g. which bundle) this batcher's model came from.
+
+    close() stops the worker thread once the queued records are scored; a
+    caller still holding the batcher afterwards gets its record scored inline.
+    """
+
+    def __init__(self, model, encoders, feature_cols, max_wait=0.005, max_batch=256,
+                 cache=None, version=None, table=None, cascade=None, pool=None, model_dir=MODEL_DIR):
+        self.model = model
+        self.encoders = encoders
+        self.feature_cols = feature_cols
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.cache = cache
+        self.version = version
+        self.table = table
+        self.cascade = cascade
+        self.pool = pool
+        self.model_dir = model_dir
+        self.assembler = feature_assembler(encoders, feature_cols)
+        # Only the worker thread scores, so one batch matrix is reused for every window
+        self._batch = np.empty((max_batch, len(self.assembler)), dtype=np.float64)
+        self._classes = [str(c) for c in model.classes_]
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()  # no record may be queued behind the close() sentinel
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, record, raw=False):
+        """Queue one record for scoring; raises ValueError if it is malformed.
+
+        The Future resolves to a JSON-ready dict, or with ``raw`` to the
+        (label, probabilities, levels) tuple the app renders from.
+        """
+        with span('encode'):
+            features = self.assembler.encode(record)
+        future = Future()
+        if self.cascade is not None:
+            with span('rule_lookup'):
+                hit = self.cascade.lookup(features)
+            if hit is not None:
+                inc('mindscope_predictions_total', source='rule')
+                future.set_result(hit if raw else self._result(*hit))
+                return future
+        if self.cache is not None:
+            with span('cache_lookup'):
+                cached = self.cache.get(self.version, features)
+            if cached is not None:
+                inc('mindscope_predictions_total', source='cache')
+                future.set_result(cached if raw else self._result(*cached))
+                return future
+        if self.table is not None:
+            with span('table_lookup'):
+                hit = self.table.lookup(features)
+            if hit is not None:
+                inc('mindscope_predictions_total', source='table')
+                future.set_result(hit if raw else self._result(*hit))
+                return future
+        self._enqueue((features, future, time.perf_counter(), not raw))
+        return future
+
+    def score(self, record, timeout=None):
+        """Submit a record and wait for its result."""
+        return self.submit(record).result(timeout)
+
+    def close(self, timeout=None):
+        """Score what is already queued, then stop the worker thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _enqueue(self, item):
+        with self._lock:
+            if not self._closed:
+                self._queue.put(item)
+                return
+        # Closed: score on the caller's thread, in its own matrix (the worker may still be using _batch)
+        self._score_batch([item], np.empty((1, len(self.assembler)), dtype=np.float64))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._score_batch(batch)
+                    return
+                batch.append(item)
+            self._score_batch(batch)
+
+    def _score_batch(self, batch, out=None):
+        now = time.perf_counter()
+        for item in batch:
+            observe(STAGE_METRIC, now - item[2], stage='queue_wait')
+        observe(BATCH_SIZE_METRIC, len(batch))
+        try:
+            with span('array_build'):
+                X = self.assembler.fill([item[0] for item in batch], self._batch if out is None else out)
+            if self.pool is not None:
+                # The pool pickles X later, from its own thread; _batch is reused by then
+                pending = self.pool.submit(X.copy(), self.model_dir)
+                start = time.perf_counter()
+                pending.add_done_callback(lambda f: self._deliver(batch, f, start))
+                return
+            with span('batch_score'):
+                outputs = score_levels(self.model, X)
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        self._finish(batch, *outputs)
+
+    def _deliver(self, batch, pending, start):
+        observe(STAGE_METRIC, time.perf_counter() - start, stage='batch_score')
+        try:
+            outputs = pending.result()
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        self._finish(batch, *outputs)
+
+    def _fail(self, batch, error):
+        inc('mindscope_prediction_errors_total', len(batch))
+        for item in batch:
+            item[1].set_exception(error)
+
+    def _finish(self, batch, labels, proba, levels):
+        inc('mindscope_predictions_total', len(batch), source='model')
+        for i, (features, future, _, wrap) in enumerate(batch):
+            raw = (labels[i], proba[i], {t: values[i] for t, values in levels.items()})
+            if self.cache is not None:
+                self.cache.put(self.version, features, raw)
+            future.set_result(self._result(*raw) if wrap else raw)
+
+    def _result(self, label, proba, levels):
+        result = {
+            'risk_level': str(label),
+            'probabilities': dict(zip(self._classes, proba.tolist())),
+        }
+        for target, level in levels.items():
+            result[target.lower()] = str(level)
+        return result
@@ -0,0 +1,103 @@
+"""
+MindScope-2025 — typed, chunked ingestion of the mental health dataset.
+
+Reads the CSV with explicit dtypes (``category`` for the categorical columns,
+small ints / float32 for the scores) instead of letting pandas infer object
+strings and int64s, optionally in chunks, and keeps a Parquet copy next to the
+CSV so later loads skip parsing entirely.
+"""
+
+import hashlib
+import os
+import warnings
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+DATASET_PATH = 'Data/Global_Mental_Health_Dataset_2025.csv'
+CACHE_DIR = 'Data/.cache'
+
+CATEGORICAL_COLUMNS = [
+    'Gender', 'Country', 'Stress_Level', 'Physical_Activity', 'Chronic_Illness',
+    'Mental_Health_History', 'Treatment', 'Outcome', 'Work_Status',
+]
+
+# Scores must be present on every row; a blank would not fit an integer dtype
+DTYPES = {
+    'Patient_ID': 'string',
+    'Age': 'int16',
+    'Depression_Score': 'int8',
+    'Anxiety_Score': 'int8',
+    'Sleep_Hours': 'float32',
+    'Days_of_Treatment': 'int16',
+    **{col: 'category' for col in CATEGORICAL_COLUMNS},
+}
+
+# Cohort files sent for scoring may have blanks anywhere: nullable ints keep
+# them as <NA> and the scorer decides per row (see inference.score_frame)
+SCORING_DTYPES = {
+    **DTYPES,
+    'Age': 'Int16',
+    'Depression_Score': 'Int8',
+    'Anxiety_Score': 'Int8',
+    'Days_of_Treatment': 'Int16',
+}
+
+
+# ==================== READING ====================
+def iter_dataset(path=DATASET_PATH, chunksize=100_000, dtype=DTYPES):
+    """Yield typed DataFrame chunks of a dataset-shaped CSV."""
+    yield from pd.read_csv(path, dtype=dtype, chunksize=chunksize)
+
+
+def concat_chunks(chunks):
+    """Concatenate typed chunks, merging each chunk's categories instead of decaying to object."""
+    chunks = list(chunks)
+    if not chunks:
+        raise ValueError("no rows to concatenate")
+    df = pd.concat(chunks, ignore_index=True)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and df[col].dtype != 'category':
+            df[col] = pd.Categorical(union_categoricals([c[col] for c in chunks]))
+    return df
+
+
+def _cache_path(path):
+    # Keyed on the absolute path too, so two files named data.csv never share an entry
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f'{stem}-{digest}.parquet')
+
+
+def read_dataset(path=DATASET_PATH, chunksize=None, cache=True):
+    """Load the dataset with explicit dtypes.
+
+    ``chunksize`` bounds the parser's working memory on large extracts. With
+    ``cache`` on, the typed frame is written to Data/.cache/<name>-<hash>.parquet
+    after the first load and reused until the CSV is modified again.
+    """
+    cache_path = _cache_path(path)
+    if cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        return pd.read_parquet(cache_path)
+
+    if chunksize is None:
+        df = pd.read_csv(path, dtype=DTYPES)
+    else:
+        df = concat_chunks(iter_dataset(path, chunksize))
+
+    if cache:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            df.to_parquet(cache_path, index=False)
+        except ImportError:
+            warnings.warn("pyarrow is not installed; skipping the Parquet cache")
+    return df
+
+
+# ==================== CLEANING ====================
+def fillna_category(series, value):
+    """fillna for categorical columns, adding ``value`` as a category if needed."""
+    if series.dtype == 'category' and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
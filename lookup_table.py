@@ -0,0 +1,310 @@
+"""
+MindScope-2025 — precomputed risk lookup table.
+
+The app only ever sends a finite input space to the model (ages 13–100,
+PHQ-9 0–27, GAD-7 0–21, half-hour sleep steps, 0–365 treatment days and a few
+encoded categories). This module enumerates a slice of that encoded space
+once, stores every cell's label and probabilities in memory-mapped .npy
+arrays, and answers requests inside the slice with an O(1) array read.
+
+Each feature becomes an axis of the table:
+  * for tree models, values between the same pair of split thresholds give
+    identical predictions, so the axis holds threshold intervals rather than
+    raw values (exact deduplication);
+  * for other models every distinct value is its own slot.
+
+For a multi-target model each cell also stores the Depression_Level and
+Anxiety_Level labels, so a table hit answers the same three levels as the
+model would.
+
+The full effective space is still far too large to store (~10^11 cells for the
+shipped models), so the builder keeps a data-driven subset: it greedily adds
+the axis slots that cover the most traffic in a sample (by default the
+training dataset) until ``max_cells`` is reached. Anything outside the table
+falls back to the model.
+
+The table is built for the model being served. When that comes from a bundle
+(models/CURRENT), the bundle is republished with the table added, so running
+apps pick it up on their next reload; a copy also goes to the flat models/
+directory.
+
+Usage (after 02_model_training.py):
+    python lookup_table.py --max-cells 1000000 --sample past_requests.csv
+"""
+
+import argparse
+import bisect
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from bundle import publish, resolve_model_dir
+from compiled_model import CompiledModel, model_arrays
+from inference import (DEFAULT_MODEL, ENCODED_COLUMNS, MODEL_DIR, build_feature_matrix,
+                       load_artifacts, model_version)
+from ingest import DATASET_PATH, read_dataset
+
+
+# Values the assessment wizard can submit for each numeric feature
+UI_DOMAINS = {
+    'Age': np.arange(13, 101),
+    'Depression_Score': np.arange(0, 28),
+    'Anxiety_Score': np.arange(0, 22),
+    'Sleep_Hours': np.arange(0, 12.5, 0.5),
+    'Days_of_Treatment': np.arange(0, 366),
+}
+
+
+def table_path(model_dir=MODEL_DIR, model_name=DEFAULT_MODEL):
+    return os.path.join(model_dir, f'{model_name}.table')
+
+
+# ==================== AXES ====================
+def split_thresholds(model, n_features):
+    """Sorted split thresholds per feature for tree models, or None for other models."""
+    if isinstance(model, CompiledModel):
+        kind, arrays = model.kind, model.arrays
+    else:
+        kind, arrays = model_arrays(model)
+    if kind != 'forest':
+        return None
+    internal = np.asarray(arrays['left']) >= 0
+    feature = np.asarray(arrays['feature'])
+    return [np.unique(np.asarray(arrays['threshold'])[internal & (feature == j)])
+            for j in range(n_features)]
+
+
+def _interval(edges, values):
+    # Trees send x left when float32(x) <= threshold
+    return np.searchsorted(edges, np.asarray(values, dtype=np.float32), side='left')
+
+
+def feature_domain(col, encoders):
+    """Every encoded value the app can send for one feature column."""
+    if col in UI_DOMAINS:
+        return UI_DOMAINS[col].astype(np.float64)
+    _, key = ENCODED_COLUMNS[col]
+    return np.arange(len(encoders[key].classes_), dtype=np.float64)
+
+
+def candidate_axes(model, encoders, feature_cols):
+    """Every slot each axis could hold: a representative value and, for trees, its interval."""
+    thresholds = split_thresholds(model, len(feature_cols))
+    axes = []
+    for j, col in enumerate(feature_cols):
+        domain = feature_domain(col, encoders)
+        if thresholds is None:
+            axes.append({'values': domain, 'edges': None, 'intervals': None})
+        else:
+            intervals, first = np.unique(_interval(thresholds[j], domain), return_index=True)
+            axes.append({'values': domain[first], 'edges': thresholds[j], 'intervals': intervals})
+    return axes
+
+
+def _candidate_index(axis, column):
+    """Candidate slot of each sample value on one axis (-1 if it has none)."""
+    if axis['edges'] is None:
+        keys, positions = axis['values'], column
+    else:
+        keys, positions = axis['intervals'], _interval(axis['edges'], column)
+    idx = np.clip(np.searchsorted(keys, positions), 0, len(keys) - 1)
+    return np.where(keys[idx] == positions, idx, -1)
+
+
+def select_slots(axes, X_sample, max_cells):
+    """Greedily pick the slots per axis that cover the most sample mass within max_cells.
+
+    Coverage is treated as the product of per-axis covered mass, so each step
+    adds the slot with the best gain in log-coverage per unit of log-size.
+    """
+    order, mass = [], []
+    for j, axis in enumerate(axes):
+        idx = _candidate_index(axis, X_sample[:, j])
+        counts = np.bincount(idx[idx >= 0], minlength=len(axis['values'])) + 1e-3
+        order.append(np.argsort(-counts, kind='stable'))
+        mass.append(counts)
+    taken = [1] * len(axes)
+    covered = [mass[j][order[j][0]] for j in range(len(axes))]
+    cells = 1
+    while True:
+        best, best_ratio = None, 0.0
+        for j in range(len(axes)):
+            n = taken[j]
+            if n == len(order[j]) or cells // n * (n + 1) > max_cells:
+                continue
+            gain = math.log((covered[j] + mass[j][order[j][n]]) / covered[j])
+            ratio = gain / math.log((n + 1) / n)
+            if ratio > best_ratio:
+                best, best_ratio = j, ratio
+        if best is None:
+            break
+        covered[best] += mass[best][order[best][taken[best]]]
+        cells = cells // taken[best] * (taken[best] + 1)
+        taken[best] += 1
+    return [np.sort(order[j][:taken[j]]) for j in range(len(axes))]
+
+
+# ==================== BUILD ====================
+def build_table(model, encoders, feature_cols, path, version, X_sample, max_cells=1_000_000,
+                chunk=65_536):
+    """Enumerate the selected slice of the encoded space and write it to ``path``."""
+    axes = candidate_axes(model, encoders, feature_cols)
+    chosen = select_slots(axes, X_sample, max_cells)
+    shape = tuple(len(c) for c in chosen)
+    values = [axes[j]['values'][chosen[j]] for j in range(len(axes))]
+
+    tmp = f'{path}.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for j, axis in enumerate(axes):
+        np.save(os.path.join(tmp, f'axis{j}_values.npy'), values[j])
+        if axis['edges'] is not None:
+            # interval id -> slot on this axis, -1 where the interval was not kept
+            slots = np.full(len(axis['edges']) + 1, -1, dtype=np.int32)
+            slots[axis['intervals'][chosen[j]]] = np.arange(len(chosen[j]), dtype=np.int32)
+            np.save(os.path.join(tmp, f'axis{j}_edges.npy'), axis['edges'])
+            np.save(os.path.join(tmp, f'axis{j}_slots.npy'), slots)
+    np.save(os.path.join(tmp, 'shape.npy'), np.asarray(shape, dtype=np.int64))
+    np.save(os.path.join(tmp, 'classes.npy'), np.asarray(model.classes_).astype(str))
+    np.save(os.path.join(tmp, 'version.npy'), np.asarray(version))
+    target_classes = dict(getattr(model, 'target_classes', None) or {})
+    primary = next(iter(target_classes), None)
+    target_classes.pop(primary, None)
+    np.save(os.path.join(tmp, 'targets.npy'), np.asarray(list(target_classes), dtype=str))
+    for i, t_classes in enumerate(target_classes.values()):
+        np.save(os.path.join(tmp, f'level{i}_classes.npy'), np.asarray(t_classes).astype(str))
+
+    n_cells = int(np.prod(shape))
+    labels = np.lib.format.open_memmap(os.path.join(tmp, 'labels.npy'), mode='w+',
+                                       dtype=np.uint8, shape=(n_cells,))
+    proba = np.lib.format.open_memmap(os.path.join(tmp, 'proba.npy'), mode='w+',
+                                      dtype=np.float32, shape=(n_cells, len(model.classes_)))
+    levels = {t: np.lib.format.open_memmap(os.path.join(tmp, f'level{i}_labels.npy'), mode='w+',
+                                           dtype=np.uint8, shape=(n_cells,))
+              for i, t in enumerate(target_classes)}
+    for start in range(0, n_cells, chunk):
+        ids = np.arange(start, min(start + chunk, n_cells))
+        idx = np.unravel_index(ids, shape)
+        X = np.column_stack([values[j][idx[j]] for j in range(len(axes))])
+        outputs = model.predict_targets(X) if levels else {primary: model.predict_proba(X)}
+        p = outputs[primary]
+        proba[start:start + len(ids)] = p
+        labels[start:start + len(ids)] = p.argmax(axis=1)
+        for t, grid in levels.items():
+            grid[start:start + len(ids)] = outputs[t].argmax(axis=1)
+    for array in (labels, proba, *levels.values()):
+        array.flush()
+    del labels, proba, levels
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmp, path)
+    return shape
+
+
+# ==================== SERVE ====================
+class RiskTable:
+    """Memory-mapped table answering in-range feature vectors without a model call."""
+
+    def __init__(self, path, mmap_mode='r'):
+        def load(name):
+            return np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+
+        self.shape = tuple(int(n) for n in load('shape.npy'))
+        self.classes_ = np.asarray(load('classes.npy'))
+        self.version = str(load('version.npy'))
+        self.labels = load('labels.npy')
+        self.proba = load('proba.npy')
+        # [(target, classes, per-cell label index)] for the other targets of a multi-target model
+        targets = load('targets.npy').tolist() if os.path.exists(os.path.join(path, 'targets.npy')) else []
+        self.levels = [(t, np.asarray(load(f'level{i}_classes.npy')), load(f'level{i}_labels.npy'))
+                       for i, t in enumerate(targets)]
+        self.targets = tuple(targets)
+        # Small per-axis arrays become lists so scalar lookups can use bisect
+        self.axes = []
+        for j in range(len(self.shape)):
+            values = load(f'axis{j}_values.npy').tolist()
+            if os.path.exists(os.path.join(path, f'axis{j}_edges.npy')):
+                self.axes.append((None, load(f'axis{j}_edges.npy').tolist(),
+                                  load(f'axis{j}_slots.npy').tolist()))
+            else:
+                self.axes.append((values, None, None))
+        self.strides = [int(np.prod(self.shape[j + 1:])) for j in range(len(self.shape))]
+
+    def index(self, features):
+        """Flat cell index of one encoded feature vector, or None if it is outside the table."""
+        flat = 0
+        for (values, edges, slots), stride, value in zip(self.axes, self.strides, features):
+            if edges is None:
+                slot = bisect.bisect_left(values, value)
+                if slot == len(values) or values[slot] != value:
+                    return None
+            else:
+                slot = slots[bisect.bisect_left(edges, float(np.float32(value)))]
+                if slot < 0:
+                    return None
+            flat += slot * stride
+        return flat
+
+    def lookup(self, features):
+        """(label, risk probabilities, {target: level}) for one encoded feature vector, or None
+        on a miss. The dict holds the other targets of a multi-target model, else it is empty."""
+        flat = self.index(features)
+        if flat is None:
+            return None
+        levels = {t: classes[grid[flat]] for t, classes, grid in self.levels}
+        return self.classes_[self.labels[flat]], np.asarray(self.proba[flat], dtype=np.float64), levels
+
+
+def load_risk_table(model_dir=MODEL_DIR, model_name=DEFAULT_MODEL, model=None):
+    """The model's lookup table if one was built for the current artifact, else None.
+
+    Passing the served ``model`` also rejects a table that lacks levels the
+    model predicts (built before tables stored them), so a hit never answers
+    with fewer targets than a model call would.
+    """
+    path = table_path(model_dir, model_name)
+    if not os.path.isdir(path):
+        return None
+    table = RiskTable(path)
+    if table.version != model_version(model_dir, model_name):
+        return None
+    if model is not None and table.targets != tuple(getattr(model, 'target_classes', None) or ())[1:]:
+        return None
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute a risk lookup table for the saved model.")
+    parser.add_argument('--models', default=MODEL_DIR, help="directory with the saved artifacts")
+    parser.add_argument('--model', default=DEFAULT_MODEL, help="artifact to tabulate (default %(default)s)")
+    parser.add_argument('--max-cells', type=int, default=1_000_000, help="table size cap (default 1000000)")
+    parser.add_argument('--sample', default=DATASET_PATH,
+                        help="dataset-shaped CSV whose traffic the table should cover")
+    args = parser.parse_args(argv)
+
+    served = resolve_model_dir(args.models)
+    model, encoders, feature_cols = load_artifacts(served, 'auto', args.model)
+    X_sample = build_feature_matrix(read_dataset(args.sample, cache=False), encoders, feature_cols)
+    # Built aside, then published with the served bundle and kept in the flat directory for later publishes
+    with tempfile.TemporaryDirectory(prefix='.table-', dir=args.models) as staging:
+        path = table_path(staging, args.model)
+        shape = build_table(model, encoders, feature_cols, path, model_version(served, args.model),
+                            X_sample, args.max_cells)
+
+        table = RiskTable(path)
+        hits = sum(table.index(row) is not None for row in X_sample.tolist())
+        size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        print(f"Lookup table: {int(np.prod(shape))} cells, axes {shape}, {size / 1e6:.1f} MB")
+        print(f"Sample coverage: {hits / len(X_sample):.1%} of {len(X_sample)} rows")
+        if served != args.models:
+            print(f"Published bundle {publish(args.models, overlay=staging)} with the table")
+        flat = table_path(args.models, args.model)
+        shutil.rmtree(flat, ignore_errors=True)
+        os.rename(path, flat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+MindScope-2025 — lightweight latency and throughput metrics for the prediction path.
+
+Counters, latency histograms and timing spans with Prometheus text exposition
+and an optional periodic JSON log, using only the standard library. Metrics
+are off unless MINDSCOPE_METRICS=1 (or enable() is called); while off,
+``span`` hands back one shared no-op context manager and ``inc``/``observe``
+return after a single flag check, so instrumented code pays next to nothing.
+
+    from metrics import span, inc
+    with span('encode'):
+        ...
+    inc('mindscope_predictions_total', source='model')
+
+Environment (read by start_from_env):
+    MINDSCOPE_METRICS=1              turn collection on
+    MINDSCOPE_METRICS_PORT=9464      serve GET /metrics on this port
+    MINDSCOPE_METRICS_HOST=127.0.0.1 interface to bind it to (0.0.0.0 = every interface)
+    MINDSCOPE_METRICS_LOG_SECONDS=60 write a JSON snapshot to stderr this often
+"""
+
+import bisect
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Seconds; spans on this path run from ~1 us (cache hits) to tens of ms (forests)
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                   1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+STAGE_METRIC = 'mindscope_stage_seconds'
+BATCH_SIZE_METRIC = 'mindscope_batch_size'
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+_enabled = os.environ.get('MINDSCOPE_METRICS', '') not in ('', '0')
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+# ==================== REGISTRY ====================
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None when empty)."""
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + (float('inf'),), self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float('inf')
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+class Registry:
+    """Thread-safe store of counters, histograms, callback values and info labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.callbacks = {}  # name -> (type, fn returning {labels tuple: value})
+        self.info = {}
+        self.buckets = {BATCH_SIZE_METRIC: BATCH_BUCKETS}  # histograms not measuring latency
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram(self.buckets.get(name, LATENCY_BUCKETS))
+            hist.observe(value)
+
+    def register_callback(self, name, fn, kind='gauge'):
+        """Report ``fn()`` (a number, or {sorted label pairs: number}) at every scrape."""
+        with self._lock:
+            self.callbacks[name] = (kind, fn)
+
+    def set_info(self, name, **labels):
+        with self._lock:
+            self.info[name] = tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def _callback_values(self):
+        values = {}
+        for name, (kind, fn) in list(self.callbacks.items()):
+            try:
+                value = fn()
+            except Exception:
+                continue
+            values[name] = (kind, value if isinstance(value, dict) else {(): value})
+        return values
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = {k: (h.buckets, list(h.counts), h.sum, h.count)
+                          for k, h in self.histograms.items()}
+            info = dict(self.info)
+        for name, labels in sorted(info.items()):
+            lines += [f'# TYPE {name} gauge', f'{name}{_format_labels(labels)} 1']
+        for name in sorted({n for n, _ in counters}):
+            lines.append(f'# TYPE {name} counter')
+            lines += [f'{name}{_format_labels(labels)} {value}'
+                      for (n, labels), value in sorted(counters.items()) if n == name]
+        for name in sorted({n for n, _ in histograms}):
+            lines.append(f'# TYPE {name} histogram')
+            for (n, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, c in zip(buckets + (float('inf'),), counts):
+                    cumulative += c
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", le)])} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        for name, (kind, values) in sorted(self._callback_values().items()):
+            lines.append(f'# TYPE {name} {kind}')
+            lines += [f'{name}{_format_labels(labels)} {value}' for labels, value in values.items()]
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        """JSON-friendly summary: counters, per-histogram count/mean/p50/p99, callbacks, info."""
+        def label_str(name, labels):
+            return name + _format_labels(labels)
+
+        with self._lock:
+            out = {
+                'counters': {label_str(n, l): v for (n, l), v in self.counters.items()},
+                'histograms': {
+                    label_str(n, l): {
+                        'count': h.count,
+                        'mean_s': h.sum / h.count if h.count else None,
+                        'p50_le_s': h.quantile(0.5),
+                        'p99_le_s': h.quantile(0.99),
+                    }
+                    for (n, l), h in self.histograms.items()
+                },
+                'info': {n: dict(l) for n, l in self.info.items()},
+            }
+        out['values'] = {label_str(n, l): v for n, (_, values) in self._callback_values().items()
+                         for l, v in values.items()}
+        return out
+
+
+REGISTRY = Registry()
+
+
+# ==================== INSTRUMENTATION ====================
+class _Span:
+    __slots__ = ('labels', 'start')
+
+    def __init__(self, labels):
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        REGISTRY.observe(STAGE_METRIC, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+def span(stage, **labels):
+    """Time a block into mindscope_stage_seconds{stage=...}; a shared no-op when disabled."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span({'stage': stage, **labels})
+
+
+def inc(name, value=1, **labels):
+    if _enabled:
+        REGISTRY.inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    if _enabled:
+        REGISTRY.observe(name, value, **labels)
+
+
+def track_cache(cache, name='mindscope_prediction_cache'):
+    """Expose a PredictionCache's hits, misses, hit rate and size at scrape time."""
+    REGISTRY.register_callback(f'{name}_hits_total', lambda: cache.stats()['hits'], 'counter')
+    REGISTRY.register_callback(f'{name}_misses_total', lambda: cache.stats()['misses'], 'counter')
+    REGISTRY.register_callback(f'{name}_hit_rate', lambda: cache.stats()['hit_rate'])
+    REGISTRY.register_callback(f'{name}_size', lambda: cache.stats()['size'])
+
+
+def set_model_version(version, model_name=None):
+    REGISTRY.set_info('mindscope_model_info', version=version, model=model_name or '')
+
+
+# ==================== EXPORT ====================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        data = REGISTRY.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port, host='127.0.0.1'):
+    """Serve GET /metrics from a daemon thread; returns the server.
+
+    Binds to loopback unless ``host`` says otherwise, so a scraper on another
+    machine needs an explicit opt-in.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
+
+
+def start_json_log(interval=60.0, stream=None):
+    """Write a JSON snapshot line every ``interval`` seconds from a daemon thread."""
+    def run():
+        while True:
+            time.sleep(interval)
+            line = json.dumps({'time': time.strftime('%Y-%m-%dT%H:%M:%S'), **REGISTRY.snapshot()})
+            print(line, file=stream or sys.stderr, flush=True)
+
+    thread = threading.Thread(target=run, name='metrics-log', daemon=True)
+    thread.start()
+    return thread
+
+
+def start_from_env():
+    """Start the exporters configured by MINDSCOPE_METRICS_PORT / _HOST / _LOG_SECONDS (if enabled)."""
+    if not _enabled:
+        return
+    port = os.environ.get('MINDSCOPE_METRICS_PORT')
+    if port:
+        start_http_server(int(port), os.environ.get('MINDSCOPE_METRICS_HOST', '127.0.0.1'))
+    seconds = float(os.environ.get('MINDSCOPE_METRICS_LOG_SECONDS', '60'))
+    if seconds > 0:
+        start_json_log(seconds)
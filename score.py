@@ -0,0 +1,111 @@
+"""
+MindScope-2025 — batch risk scoring for cohort files.
+
+Streams a CSV or Parquet file with the same columns as
+Data/Global_Mental_Health_Dataset_2025.csv through the saved model in chunks,
+so memory stays flat regardless of input size. Rows whose PHQ-9 / GAD-7
+scores fall in a cell decided by the rule cascade skip the model. Rows with a
+blank that training never filled (e.g. Age or a questionnaire score) are kept
+with an empty Risk_Level instead of failing the file.
+
+Usage:
+    python score.py cohort.csv -o cohort_scored.csv
+    python score.py cohort.parquet -o cohort_scored.parquet --chunksize 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from bundle import resolve_model_dir
+from cascade import load_cascade
+from ingest import SCORING_DTYPES, iter_dataset
+from inference import DEFAULT_MODEL, MODEL_DIR, load_artifacts, score_frame
+
+
+def _is_parquet(path):
+    return path.lower().endswith(('.parquet', '.pq'))
+
+
+def iter_chunks(path, chunksize):
+    """Yield DataFrame chunks from a CSV or Parquet file."""
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from iter_dataset(path, chunksize, SCORING_DTYPES)
+
+
+class ChunkWriter:
+    """Append scored chunks to a CSV or Parquet output file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._first = True
+
+    def write(self, frame):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._first else 'a',
+                         header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def score_file(input_path, output_path, chunksize=100_000, model_dir=MODEL_DIR,
+               id_column='Patient_ID', engine='auto', model_name=DEFAULT_MODEL, cascade=True):
+    """Score an input file chunk by chunk; returns the number of rows scored."""
+    model_dir = resolve_model_dir(model_dir)
+    model, encoders, feature_cols = load_artifacts(model_dir, engine, model_name)
+    rules = load_cascade(feature_cols, model_dir, model_name) if cascade else None
+    writer = ChunkWriter(output_path)
+    rows = 0
+    try:
+        for chunk in iter_chunks(input_path, chunksize):
+            scored = score_frame(chunk, model, encoders, feature_cols, rules)
+            if id_column in chunk.columns:
+                scored.insert(0, id_column, chunk[id_column])
+            writer.write(scored)
+            rows += len(chunk)
+    finally:
+        writer.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a cohort file with the MindScope risk model.")
+    parser.add_argument('input', help="CSV or Parquet file with the dataset's columns")
+    parser.add_argument('-o', '--output', help="output file (.csv or .parquet); default <input>_scored.csv")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="rows per chunk (default 100000)")
+    parser.add_argument('--models', default=MODEL_DIR, help="directory with the saved artifacts")
+    parser.add_argument('--engine', choices=['auto', 'numpy', 'sklearn'], default='auto',
+                        help="numpy = NumPy export, sklearn = pickled estimator (default auto)")
+    parser.add_argument('--model', default=DEFAULT_MODEL,
+                        help="artifact to serve, e.g. random_forest_model (default %(default)s)")
+    parser.add_argument('--id-column', default='Patient_ID', help="input column copied to the output")
+    parser.add_argument('--no-cascade', action='store_true',
+                        help="score every row with the model instead of answering decided score cells "
+                             "from the rule cascade")
+    args = parser.parse_args(argv)
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}_scored.csv"
+    start = time.perf_counter()
+    rows = score_file(args.input, output, args.chunksize, args.models, args.id_column,
+                      args.engine, args.model, not args.no_cascade)
+    print(f"Scored {rows} rows in {time.perf_counter() - start:.2f}s -> {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
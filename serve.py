@@ -0,0 +1,167 @@
+"""
+MindScope-2025 — local HTTP/JSON scoring service.
+
+Loads the saved artifacts once and answers scoring requests from other intake
+systems without going through Streamlit. Concurrent requests are coalesced by
+inference.MicroBatcher, so each short time window costs one predict_proba call;
+with --workers N those calls run in a pool of N worker processes.
+If lookup_table.py has built a table for the served model, vectors inside it
+are answered from the table without a model call, and so are requests whose
+PHQ-9 / GAD-7 scores fall in a cell the rule cascade (cascade.py) has decided.
+
+Usage:
+    python serve.py --port 8000 --batch-window-ms 5
+
+Endpoints:
+    GET  /health   -> {"status": "ok"}
+    GET  /stats    -> model version and prediction cache hit/miss counters
+    GET  /metrics  -> Prometheus text: per-stage latency histograms, batch sizes,
+                   prediction counters by source, cache hit rate, model version
+                   (with --metrics or MINDSCOPE_METRICS=1)
+    POST /score    body: one record or a list of records keyed by dataset column
+                   (Age, Gender, Depression_Score, Anxiety_Score, Stress_Level,
+                   Sleep_Hours, Physical_Activity, Chronic_Illness,
+                   Mental_Health_History, Treatment, Days_of_Treatment, Work_Status)
+                   -> {"risk_level": ..., "probabilities": {...}} (or a list of them),
+                   plus "depression_level" / "anxiety_level" from a multi-target model
+"""
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import metrics
+from bundle import resolve_model_dir
+from cascade import load_cascade
+from inference import (DEFAULT_MODEL, MODEL_DIR, InferencePool, MicroBatcher, PredictionCache,
+                       load_artifacts, model_version)
+from lookup_table import load_risk_table
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    batcher = None  # set by make_server
+    timeout_s = 10.0
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok'})
+        elif self.path == '/metrics' and metrics.enabled():
+            data = metrics.REGISTRY.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif self.path == '/stats':
+            cache = self.batcher.cache
+            self._send(200, {
+                'model_version': self.batcher.version,
+                'cache': cache.stats() if cache is not None else None,
+            })
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/score':
+            self._send(404, {'error': 'not found'})
+            return
+        start = time.perf_counter()
+        self._score()
+        metrics.observe(metrics.STAGE_METRIC, time.perf_counter() - start, stage='request')
+
+    def _score(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'null')
+            records = payload if isinstance(payload, list) else [payload]
+            if not all(isinstance(r, dict) for r in records):
+                raise ValueError("expected a JSON object or a list of objects")
+            futures = [self.batcher.submit(r) for r in records]
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+            return
+        try:
+            results = [f.result(self.timeout_s) for f in futures]
+        except Exception as e:
+            self._send(500, {'error': f"scoring failed: {e}"})
+            return
+        self._send(200, results if isinstance(payload, list) else results[0])
+
+    def _send(self, status, body):
+        metrics.inc('mindscope_http_responses_total', status=status)
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # keep the request path quiet; errors still surface as responses
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the stdlib default of 5 resets bursts of concurrent clients
+
+
+def make_server(host='127.0.0.1', port=8000, model_dir=MODEL_DIR,
+                batch_window_ms=5.0, max_batch=256, engine='auto',
+                model_name=DEFAULT_MODEL, cache_size=4096, cascade=True, workers=0):
+    """Build a ScoringServer whose handler threads share one MicroBatcher."""
+    model_dir = resolve_model_dir(model_dir)
+    model, encoders, feature_cols = load_artifacts(model_dir, engine, model_name)
+    batcher = MicroBatcher(model, encoders, feature_cols,
+                           max_wait=batch_window_ms / 1000.0, max_batch=max_batch,
+                           cache=PredictionCache(cache_size) if cache_size > 0 else None,
+                           version=model_version(model_dir, model_name),
+                           table=load_risk_table(model_dir, model_name, model),
+                           cascade=load_cascade(feature_cols, model_dir, model_name) if cascade else None,
+                           pool=InferencePool(workers, model_dir, engine, model_name) if workers else None,
+                           model_dir=model_dir)
+    if metrics.enabled():
+        metrics.set_model_version(batcher.version, model_name)
+        if batcher.cache is not None:
+            metrics.track_cache(batcher.cache)
+    handler = type('BoundScoringHandler', (ScoringHandler,), {'batcher': batcher})
+    return ScoringServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the MindScope risk model over HTTP/JSON.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--models', default=MODEL_DIR, help="directory with the saved artifacts")
+    parser.add_argument('--engine', choices=['auto', 'numpy', 'sklearn'], default='auto',
+                        help="numpy = NumPy export, sklearn = pickled estimator (default auto)")
+    parser.add_argument('--model', default=DEFAULT_MODEL,
+                        help="artifact to serve, e.g. random_forest_model (default %(default)s)")
+    parser.add_argument('--batch-window-ms', type=float, default=5.0,
+                        help="how long to collect concurrent requests into one batch (default 5)")
+    parser.add_argument('--max-batch', type=int, default=256, help="largest batch per model call")
+    parser.add_argument('--cache-size', type=int, default=4096,
+                        help="predictions kept in the LRU cache; 0 disables it (default 4096)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="score batches in this many worker processes (default 0: in-process)")
+    parser.add_argument('--no-cascade', action='store_true',
+                        help="send every request past the rule cascade to the table / model")
+    parser.add_argument('--metrics', action='store_true',
+                        help="collect latency metrics and serve them on GET /metrics")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        metrics.enable()
+
+    server = make_server(args.host, args.port, args.models, args.batch_window_ms, args.max_batch,
+                         args.engine, args.model, args.cache_size, not args.no_cascade, args.workers)
+    print(f"Serving MindScope risk model on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
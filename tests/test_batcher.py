@@ -0,0 +1,65 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from bundle import BundleWatcher, publish, resolve_model_dir
+from inference import MicroBatcher, load_artifacts
+from ingest import DATASET_PATH, read_dataset
+
+
+def _record():
+    return read_dataset(DATASET_PATH, cache=False).iloc[0].to_dict()
+
+
+def test_close_stops_thread_and_late_submits_still_resolve():
+    batcher = MicroBatcher(*load_artifacts())
+    record = _record()
+    expected = batcher.score(record, timeout=5)
+
+    batcher.close(timeout=5)
+    assert not batcher._thread.is_alive()
+    assert batcher.score(record, timeout=5) == expected
+    batcher.close()  # idempotent
+
+
+def test_watcher_releases_replaced_snapshot(tmp_path):
+    model_dir = tmp_path / 'models'
+    shutil.copytree('models', model_dir, ignore=shutil.ignore_patterns('bundles', 'CURRENT', 'versions'))
+    publish(str(model_dir))
+    released = []
+
+    def load(directory):
+        return (MicroBatcher(*load_artifacts(directory)),)
+
+    def release(snapshot):
+        snapshot[0].close()
+        released.append(snapshot)
+
+    watcher = BundleWatcher(load, str(model_dir), interval=0.05, release=release)
+    first = watcher.get(timeout=10)
+    with open(model_dir / 'fill_values.json', 'a') as f:
+        f.write('\n')  # new content -> new bundle version
+    publish(str(model_dir))
+
+    deadline = time.monotonic() + 10
+    while not released and time.monotonic() < deadline:
+        time.sleep(0.05)
+    watcher.stop()
+    assert released == [first]
+    assert not first[0]._thread.is_alive()
+    assert watcher.get() is not first
+    watcher.get()[0].close()
+
+
+def test_watcher_verifies_first_bundle(tmp_path):
+    model_dir = tmp_path / 'models'
+    shutil.copytree('models', model_dir, ignore=shutil.ignore_patterns('bundles', 'CURRENT', 'versions'))
+    publish(str(model_dir))
+    with open(os.path.join(resolve_model_dir(str(model_dir)), 'fill_values.json'), 'a') as f:
+        f.write('\n')  # content no longer matches the manifest
+
+    watcher = BundleWatcher(load_artifacts, str(model_dir), interval=0)
+    with pytest.raises(ValueError, match='missing or corrupt'):
+        watcher.get(timeout=10)
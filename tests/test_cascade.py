@@ -0,0 +1,99 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cascade
+from bundle import current_version, publish, resolve_model_dir
+from cascade import GAD7_MAX, PHQ9_MAX, load_cascade, write_cascade
+from clinical import get_risk_level
+from inference import build_feature_matrix, load_artifacts, score_levels
+from ingest import DATASET_PATH, read_dataset
+
+PROBES = 200
+THRESHOLD = 0.99
+
+
+@pytest.fixture(scope='module')
+def served(tmp_path_factory):
+    """Shipped model with a cascade built from every row of a small sample."""
+    model_dir = tmp_path_factory.mktemp('cascade') / 'models'
+    shutil.copytree('models', model_dir,
+                    ignore=shutil.ignore_patterns('bundles', 'CURRENT', 'versions', '*.cascade.npz'))
+    model, encoders, feature_cols = load_artifacts(str(model_dir))
+    X = build_feature_matrix(read_dataset(DATASET_PATH).head(PROBES), encoders, feature_cols)
+    write_cascade(str(model_dir), X_sample=X, threshold=THRESHOLD, probes=PROBES)
+    return model, load_cascade(feature_cols, str(model_dir)), feature_cols, X
+
+
+def test_decided_cells_agree_with_rule_and_model(served):
+    model, rules, feature_cols, X = served
+    dep_col, anx_col = feature_cols.index('Depression_Score'), feature_cols.index('Anxiety_Score')
+    assert 0 < rules.coverage() < 1
+    for dep in range(PHQ9_MAX + 1):
+        for anx in range(GAD7_MAX + 1):
+            cell = X.copy()
+            cell[:, dep_col], cell[:, anx_col] = dep, anx
+            proba = model.predict_proba(cell)
+            agree = (model.classes_[proba.argmax(axis=1)] == get_risk_level(dep, anx)).mean()
+            assert rules.decided[dep, anx] == (agree >= THRESHOLD)
+            if rules.decided[dep, anx]:
+                label, cell_proba, _ = rules.lookup(cell[0])
+                assert label == get_risk_level(dep, anx)
+                np.testing.assert_allclose(cell_proba, proba.mean(axis=0), atol=1e-6)  # stored as float32
+            else:
+                assert rules.lookup(cell[0]) is None
+
+
+class RecordingModel:
+    """Wraps a model and keeps every row it was asked to score."""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = model.classes_
+        self.seen = []
+
+    def predict_proba(self, X):
+        self.seen.append(np.array(X))
+        return self.model.predict_proba(X)
+
+
+def test_score_levels_sends_only_undecided_rows_to_the_model(served):
+    model, rules, feature_cols, X = served
+    X = X.copy()
+    dep_col = feature_cols.index('Depression_Score')
+    X[:3, dep_col] = [PHQ9_MAX + 1, -1, 4.5]  # outside the grid: always the model
+    dep, anx = X[:, dep_col], X[:, feature_cols.index('Anxiety_Score')]
+    in_grid = (dep >= 0) & (dep <= PHQ9_MAX) & (dep % 1 == 0)
+    decided = in_grid & rules.decided[np.where(in_grid, dep, 0).astype(int), anx.astype(int)]
+    assert decided.any() and not decided.all()
+
+    recorder = RecordingModel(model)
+    labels, proba, levels = rules.score_levels(recorder, X)
+    assert np.array_equal(np.vstack(recorder.seen), X[~decided])
+    model_labels, model_proba, _ = score_levels(model, X[~decided])
+    assert labels[~decided].tolist() == model_labels.tolist()
+    np.testing.assert_array_equal(proba[~decided], model_proba)
+    for i in np.flatnonzero(decided):
+        label, cell_proba, _ = rules.lookup(X[i])
+        assert labels[i] == label
+        np.testing.assert_array_equal(proba[i], cell_proba)
+    assert levels == {}
+
+
+def test_main_publishes_the_cascade_with_the_served_bundle(tmp_path):
+    model_dir = tmp_path / 'models'
+    shutil.copytree('models', model_dir,
+                    ignore=shutil.ignore_patterns('bundles', 'CURRENT', 'versions', '*.cascade.npz'))
+    before = publish(str(model_dir))
+    sample = tmp_path / 'sample.csv'
+    pd.read_csv(DATASET_PATH).head(50).to_csv(sample, index=False)
+
+    cascade.main(['--models', str(model_dir), '--sample', str(sample), '--probes', '50'])
+
+    assert current_version(str(model_dir)) != before
+    _, _, feature_cols = load_artifacts(str(model_dir))
+    assert load_cascade(feature_cols, resolve_model_dir(str(model_dir))) is not None
+    assert os.path.exists(cascade.cascade_path(str(model_dir)))
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+from compiled_model import CompiledModel, export_model
+
+TARGETS = ('Risk_Level', 'Depression_Level')
+FEATURES = ['a', 'b', 'c', 'd']
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 20, size=(400, len(FEATURES))).astype(np.float64)
+    risk = np.where(X[:, 0] + X[:, 1] > 25, 'High', np.where(X[:, 0] > 8, 'Moderate', 'Low'))
+    depression = np.where(X[:, 2] > 10, 'Severe', 'Mild')
+    return X, risk, np.column_stack([risk, depression])
+
+
+@pytest.mark.parametrize('fmt', ['npz', 'npy'])
+@pytest.mark.parametrize('estimator, multi_target', [
+    (LogisticRegression(max_iter=1000), False),
+    (DecisionTreeClassifier(max_depth=6, random_state=0), False),
+    (RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0), False),
+    (RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0), True),
+])
+def test_compiled_model_matches_sklearn(tmp_path, estimator, multi_target, fmt):
+    X, risk, both = _data()
+    model = estimator.fit(X, both if multi_target else risk)
+    encoders = {'stress': LabelEncoder().fit(['High', 'Low', 'Medium'])}
+    path = str(tmp_path / ('model.npz' if fmt == 'npz' else 'model'))
+    export_model(model, encoders, FEATURES, path, targets=TARGETS if multi_target else None)
+    compiled = CompiledModel.load(path, mmap_mode='r' if fmt == 'npy' else None)
+
+    assert compiled.feature_cols == FEATURES
+    assert compiled.encoder_classes['stress'].tolist() == ['High', 'Low', 'Medium']
+    X_test = np.vstack([X[:50], X[:50] + 0.5])  # includes values between split thresholds
+    expected = model.predict_proba(X_test)
+    if multi_target:
+        targets = compiled.predict_targets(X_test)
+        assert list(targets) == list(TARGETS)
+        for (target, proba), sk_proba, classes in zip(targets.items(), expected, model.classes_):
+            np.testing.assert_allclose(proba, sk_proba, atol=1e-12)
+            assert compiled.target_classes[target].tolist() == classes.tolist()
+        expected = expected[0]
+    np.testing.assert_allclose(compiled.predict_proba(X_test), expected, atol=1e-12)
+    assert compiled.predict(X_test).tolist() == np.asarray(model.predict(X_test)).reshape(len(X_test), -1)[:, 0].tolist()
+    np.testing.assert_allclose(compiled.predict_proba(X_test[0]), expected[:1], atol=1e-12)  # one 1-D row
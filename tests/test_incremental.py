@@ -0,0 +1,42 @@
+import importlib
+import os
+
+from sklearn.preprocessing import LabelEncoder
+
+from bundle import current_version, publish, resolve_model_dir
+
+incremental = importlib.import_module('03_incremental_training')
+
+
+def test_extend_encoder_keeps_codes_and_appends_new_labels():
+    encoder = LabelEncoder().fit(['Low', 'Moderate', 'High'])
+    codes = encoder.transform(['High', 'Low', 'Moderate']).tolist()
+
+    extended, added = incremental.extend_encoder(encoder, ['Moderate', 'Extreme', None, 'Extreme', 'Zero'])
+    assert added == ['Extreme', 'Zero']
+    assert extended.transform(['High', 'Low', 'Moderate']).tolist() == codes
+    assert extended.transform(['Extreme', 'Zero']).tolist() == [3, 4]
+    assert encoder.classes_.tolist() == ['High', 'Low', 'Moderate']  # the base encoder is untouched
+
+    same, added = incremental.extend_encoder(encoder, ['Low'])
+    assert same is encoder and added == []
+
+
+def test_publish_overlay_swaps_in_the_updated_artifacts(tmp_path):
+    model_dir, version_dir = tmp_path / 'models', tmp_path / 'version'
+    for directory, files in ((model_dir, {'forest.pkl': 'old', 'encoders.pkl': 'old', 'other.pkl': 'kept'}),
+                             (version_dir, {'forest.pkl': 'new', 'encoders.pkl': 'new'})):
+        directory.mkdir()
+        for name, content in files.items():
+            (directory / name).write_text(content)
+        (directory / 'forest').mkdir()
+        (directory / 'forest' / f'{directory.name}.npy').write_text(content)
+    first = publish(str(model_dir))
+
+    second = publish(str(model_dir), overlay=str(version_dir))
+    assert second != first and current_version(str(model_dir)) == second
+    bundle = resolve_model_dir(str(model_dir))
+    contents = {name: open(os.path.join(bundle, name)).read() for name in ('forest.pkl', 'encoders.pkl', 'other.pkl')}
+    assert contents == {'forest.pkl': 'new', 'encoders.pkl': 'new', 'other.pkl': 'kept'}
+    assert os.listdir(os.path.join(bundle, 'forest')) == ['version.npy']
+    assert sorted(os.listdir(model_dir / 'bundles')) == sorted([first, second])
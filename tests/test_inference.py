@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inference import (MicroBatcher, build_feature_matrix, encode_record, feature_assembler, load_artifacts,
+                       load_fill_values, score_frame)
+from ingest import DATASET_PATH, read_dataset
+
+
+@pytest.fixture(scope='module')
+def rows():
+    return read_dataset(DATASET_PATH, cache=False).head(50).copy()
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'sklearn'])
+def test_blank_cells_get_training_fill_values(rows, engine):
+    model, encoders, feature_cols = load_artifacts(engine=engine)
+    fills = load_fill_values()
+    filled = rows.copy()
+    rows['Sleep_Hours'] = np.nan
+    rows['Physical_Activity'] = pd.Series([None] * len(rows), index=rows.index, dtype=object)
+    filled['Sleep_Hours'] = fills['Sleep_Hours']
+    filled['Physical_Activity'] = fills['Physical_Activity']
+
+    X = build_feature_matrix(rows, encoders, feature_cols)
+    assert np.array_equal(X, build_feature_matrix(filled, encoders, feature_cols))
+
+    scored = score_frame(rows, model, encoders, feature_cols)
+    assert np.isfinite(scored.filter(like='Prob_').to_numpy()).all()
+    assert scored['Risk_Level'].tolist() == score_frame(filled, model, encoders, feature_cols)['Risk_Level'].tolist()
+
+
+def test_blank_record_matches_filled_record(rows):
+    _, encoders, feature_cols = load_artifacts()
+    fills = load_fill_values()
+    record = rows.iloc[0].to_dict()
+    blank = {**record, 'Sleep_Hours': None, 'Physical_Activity': None}
+    filled = {**record, 'Sleep_Hours': fills['Sleep_Hours'], 'Physical_Activity': fills['Physical_Activity']}
+    assert encode_record(blank, encoders, feature_cols) == encode_record(filled, encoders, feature_cols)
+
+
+def test_assembler_is_planned_once_per_encoders_and_feature_order():
+    model, encoders, feature_cols = load_artifacts()
+    assembler = feature_assembler(encoders, feature_cols)
+    assert feature_assembler(encoders, list(feature_cols)) is assembler
+    assert feature_assembler(encoders, feature_cols[::-1]) is not assembler
+    batcher = MicroBatcher(model, encoders, feature_cols)
+    assert batcher.assembler is assembler
+    batcher.close()
@@ -0,0 +1,52 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import lookup_table
+from bundle import current_version, publish, resolve_model_dir
+from inference import build_feature_matrix, load_artifacts, model_version, score_levels
+from ingest import DATASET_PATH, read_dataset
+
+
+@pytest.mark.parametrize('model_name', ['best_risk_model', 'random_forest_model'])
+def test_lookup_matches_model_on_every_cell(tmp_path, model_name):
+    model, encoders, feature_cols = load_artifacts(model_name=model_name)
+    X_sample = build_feature_matrix(read_dataset(DATASET_PATH).head(20), encoders, feature_cols)
+    path = str(tmp_path / 'table')
+    shape = lookup_table.build_table(model, encoders, feature_cols, path, 'v1', X_sample, max_cells=2000)
+    table = lookup_table.RiskTable(path)
+
+    values = [np.load(os.path.join(path, f'axis{j}_values.npy')) for j in range(len(shape))]
+    cells = np.unravel_index(np.arange(int(np.prod(shape))), shape)
+    X = np.column_stack([values[j][cells[j]] for j in range(len(shape))])
+    labels, proba, _ = score_levels(model, X)
+    for i, row in enumerate(X.tolist()):
+        label, cell_proba, levels = table.lookup(row)
+        assert label == labels[i] and levels == {}
+        np.testing.assert_allclose(cell_proba, proba[i], atol=1e-6)  # stored as float32
+
+    outside = list(X_sample[0])
+    outside[feature_cols.index('Age')] = 1000
+    assert table.lookup(outside) is None
+
+
+def test_main_publishes_the_table_with_the_served_bundle(tmp_path):
+    model_dir = tmp_path / 'models'
+    shutil.copytree('models', model_dir,
+                    ignore=shutil.ignore_patterns('bundles', 'CURRENT', 'versions', '*.table'))
+    before = publish(str(model_dir))
+    sample = tmp_path / 'sample.csv'
+    pd.read_csv(DATASET_PATH).head(20).to_csv(sample, index=False)
+
+    lookup_table.main(['--models', str(model_dir), '--sample', str(sample), '--max-cells', '500'])
+
+    assert current_version(str(model_dir)) != before
+    served = resolve_model_dir(str(model_dir))
+    model, _, _ = load_artifacts(served)
+    table = lookup_table.load_risk_table(served, model=model)
+    assert table is not None and table.version == model_version(served)
+    assert os.path.isdir(lookup_table.table_path(str(model_dir)))
+    assert [n for n in os.listdir(model_dir) if n.startswith('.table-')] == []
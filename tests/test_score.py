@@ -0,0 +1,17 @@
+import pandas as pd
+
+from ingest import DATASET_PATH
+from score import score_file
+
+
+def test_blank_required_field_leaves_only_that_row_unscored(tmp_path):
+    cohort = pd.read_csv(DATASET_PATH).head(20)
+    cohort.loc[0, 'Age'] = None
+    cohort.loc[1, 'Depression_Score'] = None
+    source, output = tmp_path / 'cohort.csv', tmp_path / 'scored.csv'
+    cohort.to_csv(source, index=False)
+
+    assert score_file(str(source), str(output), chunksize=8) == 20
+    scored = pd.read_csv(output)
+    assert scored['Risk_Level'].isna().tolist() == [True, True] + [False] * 18
+    assert scored['Patient_ID'].tolist() == cohort['Patient_ID'].tolist()
@@ -0,0 +1,59 @@
+"""
+MindScope-2025 — latency helpers shared by benchmark.py and the training stages.
+
+measure() times individual calls of a function and reports percentiles;
+bench_load() times loading a saved model with one engine.
+"""
+
+import gc
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from inference import compiled_path, load_artifacts
+
+
+# ==================== TIMING ====================
+def measure(fn, repeat=200, warmup=5):
+    """Time ``repeat`` individual calls of ``fn``; latency percentiles in microseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter_ns()
+        fn()
+        samples[i] = time.perf_counter_ns() - start
+    samples /= 1e3
+    return {
+        'repeat': repeat,
+        'mean_us': float(samples.mean()),
+        'median_us': float(np.median(samples)),
+        'p95_us': float(np.percentile(samples, 95)),
+        'p99_us': float(np.percentile(samples, 99)),
+        'min_us': float(samples.min()),
+    }
+
+
+# ==================== ARTIFACTS ====================
+def engines(model_dir, model_name):
+    """Engines a saved model can be loaded with: 'numpy' for an export, 'sklearn' for a pickle."""
+    available = []
+    if compiled_path(model_dir, model_name):
+        available.append('numpy')
+    if os.path.exists(os.path.join(model_dir, f'{model_name}.pkl')):
+        available.append('sklearn')
+    return available
+
+
+def bench_load(model_dir, model_name, engine, repeat=5):
+    """Artifact load time and the Python heap it allocates."""
+    gc.collect()
+    tracemalloc.start()
+    load_artifacts(model_dir, engine, model_name)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = measure(lambda: load_artifacts(model_dir, engine, model_name), repeat=repeat, warmup=0)
+    stats['peak_alloc_mb'] = peak / 1e6
+    return stats